@@ -0,0 +1,130 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from cache import MemoryBackend, RedisBackend
+
+# 토큰 서명 키 (여러 프로세스로 실행하면 모두 같은 값을 지정해야 함)
+SECRET = os.environ.get("AUTH_SECRET")
+if not SECRET:
+    SECRET = uuid.uuid4().hex + uuid.uuid4().hex
+    print("AUTH_SECRET is not set, tokens will not survive a restart")
+
+ACCESS_TOKEN_TTL = int(os.environ.get("ACCESS_TOKEN_TTL", "900"))
+REFRESH_TOKEN_TTL = int(os.environ.get("REFRESH_TOKEN_TTL", str(14 * 24 * 3600)))
+# 폐기된 토큰 목록 크기 (토큰이 만료되면 목록에서도 빠짐)
+DENYLIST_SIZE = int(os.environ.get("AUTH_DENYLIST_SIZE", "100000"))
+
+ACCESS = "access"
+REFRESH = "refresh"
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(SECRET.encode(), signing_input.encode(), hashlib.sha256).digest())
+
+
+# HS256 JWT 만들기
+def encode(claims: dict) -> str:
+    signing_input = _b64encode(json.dumps(_HEADER, separators=(",", ":")).encode()) + "." + \
+        _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return signing_input + "." + _sign(signing_input)
+
+
+# 서명과 만료를 확인하고 claims 를 돌려줌 (DB 조회 없음)
+def decode(token: str, token_type: str = ACCESS) -> dict:
+    try:
+        header, payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(header + "." + payload)):
+            raise ValueError("bad signature")
+        if json.loads(_b64decode(header)).get("alg") != "HS256":
+            raise ValueError("bad algorithm")
+        claims = json.loads(_b64decode(payload))
+        if not isinstance(claims, dict):
+            raise ValueError("bad claims")
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid token", headers={"WWW-Authenticate": "Bearer"})
+    if claims.get("typ") != token_type or claims.get("exp", 0) < time.time():
+        raise HTTPException(status_code=401, detail="Token expired or invalid", headers={"WWW-Authenticate": "Bearer"})
+    if is_revoked(claims):
+        raise HTTPException(status_code=401, detail="Token revoked", headers={"WWW-Authenticate": "Bearer"})
+    return claims
+
+
+def issue(user_id: int, token_type: str, ttl: int) -> str:
+    return issue_claims({"sub": user_id, "typ": token_type}, ttl)
+
+
+# 임의의 claims 로 토큰 발급 (typ 필수, jti/iat/exp 는 자동)
+def issue_claims(claims: dict, ttl: int) -> str:
+    now = int(time.time())
+    return encode({**claims, "jti": uuid.uuid4().hex, "iat": now, "exp": now + ttl})
+
+
+# 로그인/갱신 응답
+def issue_tokens(user_id: int) -> dict:
+    return {
+        "access_token": issue(user_id, ACCESS, ACCESS_TOKEN_TTL),
+        "refresh_token": issue(user_id, REFRESH, REFRESH_TOKEN_TTL),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_TTL,
+    }
+
+
+# 폐기 목록: Redis 가 있으면 프로세스끼리 공유, 없으면 프로세스 내 LRU
+def create_denylist():
+    redis_url = os.environ.get("CACHE_REDIS_URL")
+    if redis_url:
+        import redis
+        return RedisBackend(redis.Redis.from_url(redis_url), prefix="ccrc:revoked:")
+    return MemoryBackend(max_entries=DENYLIST_SIZE)
+
+
+denylist = create_denylist()
+
+
+def revoke(claims: dict):
+    ttl = claims["exp"] - time.time()
+    if ttl > 0:
+        denylist.set(claims["jti"], True, ttl)
+
+
+def is_revoked(claims: dict) -> bool:
+    return denylist.get(claims.get("jti", "")) is not None
+
+
+# 리프레시 토큰으로 새 토큰 발급 (쓴 리프레시 토큰은 폐기해서 한 번만 쓸 수 있음)
+def refresh(refresh_token: str) -> dict:
+    claims = decode(refresh_token, REFRESH)
+    revoke(claims)
+    return issue_tokens(claims["sub"])
+
+
+bearer = HTTPBearer(auto_error=False)
+
+
+# 요청한 사용자의 토큰 claims (토큰만 확인하고 DB 는 조회하지 않음)
+def current_claims(credentials: HTTPAuthorizationCredentials = Depends(bearer)) -> dict:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return decode(credentials.credentials, ACCESS)
+
+
+def current_user_id(claims: dict = Depends(current_claims)) -> int:
+    return claims["sub"]
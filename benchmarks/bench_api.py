@@ -0,0 +1,324 @@
+"""API 부하 테스트 / 벤치마크.
+
+임시 SQLite DB 에 가상의 카탈로그(사용자, 카테고리, 제품, 리뷰, 주문)를 만들고
+주요 엔드포인트를 ASGI 로 직접 호출해서 시나리오별 처리량과 p50/p95/p99 지연을 JSON 으로 출력한다.
+S3 와 GPU 서버는 스텁을 사용하고, /ws 에 여러 클라이언트를 붙여 진행 상황 팬아웃 지연도 잰다.
+같은 --seed 와 옵션이면 같은 데이터와 요청 순서로 실행되므로 --baseline 으로 이전 결과와 비교할 수 있다.
+
+    python benchmarks/bench_api.py --items 5000 --requests 500 --concurrency 32 --output result.json
+    python benchmarks/bench_api.py --scenarios items_list item_detail --baseline result.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ["chair", "table", "lamp", "sofa", "desk", "shelf", "mirror", "rug", "bed", "stool"]
+COLORS = ["red", "blue", "green", "black", "white", "oak", "walnut", "grey"]
+PASSWORD = "bench-password"
+
+
+# 카탈로그 생성 (models 로 직접 넣고 검색 색인과 리뷰 통계는 한 번에 다시 만듦)
+def seed(args) -> dict:
+    import crud, models, passwords, search_index
+    from database import SessionLocal
+
+    rng = random.Random(args.seed)
+    db = SessionLocal()
+    try:
+        # argon2 해시는 느리므로 하나를 만들어 모든 사용자가 같이 씀
+        password_hash = passwords.hash_password(PASSWORD)
+        db.add_all([models.User(email=f"user{i}@example.com", password=password_hash) for i in range(args.users)])
+        db.add_all([models.Category(name=f"category {i}") for i in range(args.categories)])
+        db.flush()
+        user_ids = [row.id for row in db.query(models.User.id)]
+        category_ids = [row.id for row in db.query(models.Category.id)]
+
+        db.add_all([
+            models.Item(
+                name=f"{rng.choice(COLORS)} {rng.choice(WORDS)} {i}",
+                description=f"A {rng.choice(COLORS)} {rng.choice(WORDS)} for benchmarking",
+                price=rng.randint(1000, 500000),
+                category_id=rng.choice(category_ids),
+                image=f"https://bench.s3.amazonaws.com/item{i}.png",
+            )
+            for i in range(args.items)
+        ])
+        db.flush()
+        item_ids = [row.id for row in db.query(models.Item.id)]
+
+        db.add_all([
+            models.Review(content=f"review {i}", star=rng.randint(1, 5), user_id=rng.choice(user_ids), item_id=rng.choice(item_ids))
+            for i in range(args.reviews)
+        ])
+        db.add_all([
+            models.Order(user_id=rng.choice(user_ids), item_id=rng.choice(item_ids), price=rng.randint(1000, 500000), count=1, pay=True)
+            for _ in range(args.orders)
+        ])
+        db.commit()
+        search_index.rebuild(db)
+        crud.rebuild_item_ratings(db)
+        return {"user_ids": user_ids, "category_ids": category_ids, "item_ids": item_ids}
+    finally:
+        db.close()
+
+
+# 시나리오 이름 -> 요청 i 번째의 (메서드, 경로, 추가 인자) 를 만드는 함수
+def build_scenarios(catalog: dict, tokens: dict, rng: random.Random) -> dict:
+    item_ids = catalog["item_ids"]
+    category_ids = catalog["category_ids"]
+    user_ids = catalog["user_ids"]
+
+    def auth_header(user_id):
+        return {"Authorization": f"Bearer {tokens[user_id]}"}
+
+    def review_create(i):
+        item_id = rng.choice(item_ids)
+        body = {"content": "bench", "star": rng.randint(1, 5), "item_id": item_id}
+        return "POST", f"/api/items/{item_id}/reviews/", {"json": body, "headers": auth_header(rng.choice(user_ids))}
+
+    return {
+        "items_list": lambda i: ("GET", "/api/items/", {"params": {"limit": 20}}),
+        "item_detail": lambda i: ("GET", f"/api/items/{rng.choice(item_ids)}", {}),
+        "item_detail_reviews": lambda i: ("GET", f"/api/items/{rng.choice(item_ids)}/detail", {}),
+        "category": lambda i: ("GET", f"/api/items/category/{rng.choice(category_ids)}", {"params": {"limit": 20}}),
+        "search": lambda i: ("GET", f"/api/items/search/{rng.choice(COLORS)} {rng.choice(WORDS)}", {"params": {"limit": 20}}),
+        "login": lambda i: ("POST", "/api/login", {"json": {"email": f"user{rng.randrange(len(user_ids))}@example.com", "password": PASSWORD}}),
+        "order_create": lambda i: (
+            "POST", "/api/order/",
+            {"json": {"item_id": rng.choice(item_ids), "count": 1}, "headers": auth_header(rng.choice(user_ids))},
+        ),
+        "review_create": review_create,
+        "review_read": lambda i: ("GET", f"/api/items/{rng.choice(item_ids)}/reviews/", {}),
+        "orders_me": lambda i: ("GET", "/api/orders/me", {"headers": auth_header(rng.choice(user_ids))}),
+    }
+
+
+async def run_scenario(client, make_request, requests: int, concurrency: int) -> dict:
+    from benchmarks.stats import summarize
+
+    # 요청 내용은 먼저 만들어 둠 (동시 실행 순서와 상관없이 같은 요청 목록)
+    planned = [make_request(i) for i in range(requests)]
+    pending = iter(planned)
+    latencies = []
+    errors = 0
+    statuses = {}
+
+    async def worker():
+        nonlocal errors
+        for method, path, kwargs in pending:
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    result = summarize(latencies, time.perf_counter() - started, errors)
+    result["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+# httpx 의 ASGITransport 는 웹소켓을 지원하지 않으므로 ASGI 메시지를 직접 주고받는 최소 클라이언트
+class ASGIWebSocket:
+    def __init__(self, app, path: str, client_port: int):
+        self.app = app
+        self.path = path
+        self.client_port = client_port
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        self.task = None
+
+    async def connect(self):
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "path": self.path,
+            "raw_path": self.path.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"bench")],
+            "client": ("127.0.0.1", self.client_port),
+            "server": ("bench", 80),
+            "subprotocols": [],
+        }
+        self.task = asyncio.create_task(self.app(scope, self.inbound.get, self.outbound.put))
+        await self.inbound.put({"type": "websocket.connect"})
+        message = await self.outbound.get()
+        if message["type"] != "websocket.accept":
+            raise RuntimeError(f"WebSocket rejected: {message}")
+
+    async def send_text(self, text: str):
+        await self.inbound.put({"type": "websocket.receive", "text": text})
+
+    async def receive_text(self) -> str:
+        message = await self.outbound.get()
+        if message["type"] != "websocket.send":
+            raise RuntimeError(f"WebSocket closed: {message}")
+        return message["text"]
+
+    async def close(self):
+        await self.inbound.put({"type": "websocket.disconnect", "code": 1000})
+        await self.task
+
+
+# 클라이언트들이 한 제품을 구독하고, GPU 워커 역할로 /api/progress 에 이벤트를 올린 뒤
+# 모든 클라이언트가 받을 때까지의 지연을 잼
+async def run_websocket_fanout(app, client, item_id: int, clients: int, messages: int) -> dict:
+    import websocket
+    from benchmarks.stats import summarize
+
+    sockets = [ASGIWebSocket(app, "/ws", 10000 + i) for i in range(clients)]
+    started = time.perf_counter()
+    await asyncio.gather(*[socket.connect() for socket in sockets])
+    connect_seconds = time.perf_counter() - started
+    for socket in sockets:
+        await socket.send_text(f"subscribe:{item_id}")
+    # 모든 구독이 허브에 등록될 때까지 기다림
+    while len(getattr(websocket.progress_hub.jobs.get(item_id), "subscribers", ())) < clients:
+        await asyncio.sleep(0.01)
+
+    latencies = []
+    timeouts = 0
+
+    async def wait_for(socket, progress: int, sent_at: float):
+        nonlocal timeouts
+        try:
+            while True:
+                message = json.loads(await asyncio.wait_for(socket.receive_text(), 10))
+                if message.get("progress") == progress:
+                    latencies.append(time.perf_counter() - sent_at)
+                    return
+        except asyncio.TimeoutError:
+            timeouts += 1
+
+    started = time.perf_counter()
+    for n in range(messages):
+        # 100 이 되면 작업이 닫히므로 그보다 작은 값만 보냄
+        progress = 1 + n % 98
+        sent_at = time.perf_counter()
+        response = await client.post("/api/progress", json={"item_id": item_id, "progress": progress, "status": "running"})
+        response.raise_for_status()
+        await asyncio.gather(*[wait_for(socket, progress, sent_at) for socket in sockets])
+    elapsed = time.perf_counter() - started
+
+    await asyncio.gather(*[socket.close() for socket in sockets])
+    result = summarize(latencies, elapsed, timeouts)
+    result.update({"clients": clients, "messages": messages, "connect_seconds": round(connect_seconds, 3)})
+    return result
+
+
+# 이전 결과와 비교해서 처리량/p95 변화율 계산 (+ 는 처리량 증가, 지연 증가)
+def compare(results: dict, baseline: dict) -> dict:
+    changes = {}
+    sections = dict(results["scenarios"], websocket_fanout=results.get("websocket_fanout"))
+    old_sections = dict(baseline.get("scenarios", {}), websocket_fanout=baseline.get("websocket_fanout"))
+    for name, current in sections.items():
+        old = old_sections.get(name)
+        if not current or not old:
+            continue
+        changes[name] = {
+            key: round((current[key] - old[key]) / old[key] * 100, 1) if old[key] else None
+            for key in ("throughput", "p50_ms", "p95_ms", "p99_ms")
+        }
+    return changes
+
+
+async def run(app_main, catalog: dict, args) -> dict:
+    import httpx
+    import auth
+
+    rng = random.Random(args.seed)
+    tokens = {user_id: auth.issue_tokens(user_id)["access_token"] for user_id in catalog["user_ids"]}
+    scenarios = build_scenarios(catalog, tokens, rng)
+    selected = args.scenarios or list(scenarios) + ["websocket_fanout"]
+
+    results = {"scenarios": {}}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app_main.app), base_url="http://bench") as client:
+        for name in selected:
+            if name == "websocket_fanout":
+                continue
+            # 캐시를 채우는 워밍업 요청은 결과에 넣지 않음
+            await run_scenario(client, scenarios[name], min(args.warmup, args.requests), args.concurrency)
+            results["scenarios"][name] = await run_scenario(client, scenarios[name], args.requests, args.concurrency)
+        if "websocket_fanout" in selected and args.ws_clients:
+            results["websocket_fanout"] = await run_websocket_fanout(
+                app_main.app, client, catalog["item_ids"][0], args.ws_clients, args.ws_messages
+            )
+    return results
+
+
+def main():
+    scenario_names = [
+        "items_list", "item_detail", "item_detail_reviews", "category", "search", "login",
+        "order_create", "review_create", "review_read", "orders_me", "websocket_fanout",
+    ]
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--reviews", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=500, help="시나리오별 요청 수")
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--ws-clients", type=int, default=500)
+    parser.add_argument("--ws-messages", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenarios", nargs="*", choices=scenario_names, help="실행할 시나리오 (기본: 전부)")
+    parser.add_argument("--output", help="결과 JSON 을 저장할 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    # 아래에서 임시 디렉터리로 이동하므로 경로를 먼저 절대 경로로 바꿈
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+    # 모든 요청이 같은 클라이언트 주소에서 오므로 요청 제한은 끔
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    sys.path.insert(0, ROOT)
+    os.chdir(tmp)
+    from benchmarks.stubs import install_gpu_stub, install_s3_stub
+    install_s3_stub()
+    install_gpu_stub()
+
+    # 앱의 print 출력이 JSON 결과에 섞이지 않도록 stderr 로 보냄
+    with contextlib.redirect_stdout(sys.stderr):
+        import main as app_main
+
+        started = time.perf_counter()
+        catalog = seed(args)
+        seed_seconds = time.perf_counter() - started
+        results = asyncio.run(run(app_main, catalog, args))
+
+    results = {
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "categories", "items", "reviews", "orders", "requests", "concurrency", "ws_clients", "ws_messages", "seed")
+        },
+        "seed_seconds": round(seed_seconds, 3),
+        **results,
+    }
+    if baseline_path:
+        with open(baseline_path) as f:
+            results["change_percent"] = compare(results, json.load(f))
+    output = json.dumps(results, indent=2)
+    if output_path:
+        with open(output_path, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""로그인 벤치마크.
+
+argon2id 검증 스레드 풀의 워커 수를 바꿔가며 /api/login 의 처리량과 p50/p95/p99 지연을 JSON 으로 출력한다.
+앱은 ASGI 로 직접 호출하고 DB 는 임시 SQLite 파일을 사용한다.
+
+    python benchmarks/bench_login.py --users 50 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def run(app, users: int, requests: int, concurrency: int) -> dict:
+    import httpx
+    from benchmarks.stats import summarize
+
+    latencies = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                body = {"email": f"user{i % users}@example.com", "password": f"password-{i % users}"}
+                started = time.perf_counter()
+                response = await client.post("/api/login", json=body)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, elapsed, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="*", help="비교할 워커 수 (기본: 1, 2, 4, ... 코어 수)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+    # 모든 요청이 같은 클라이언트 주소에서 오므로 요청 제한은 끔
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+    sys.path.insert(0, ROOT)
+    os.chdir(tmp)
+    from benchmarks.stubs import install_s3_stub
+    install_s3_stub()
+
+    import main as app_main, models, passwords
+    from database import SessionLocal
+
+    db = SessionLocal()
+    db.add_all([
+        models.User(email=f"user{i}@example.com", password=passwords.hash_password(f"password-{i}"))
+        for i in range(args.users)
+    ])
+    db.commit()
+    db.close()
+
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, cores} & set(range(1, cores + 1)) | {cores})
+    results = {
+        "argon2": {"time_cost": passwords.TIME_COST, "memory_cost": passwords.MEMORY_COST, "parallelism": passwords.PARALLELISM},
+        "cores": cores,
+        "runs": {},
+    }
+    for count in workers:
+        passwords.set_workers(count, max_pending=args.requests)
+        results["runs"][str(count)] = asyncio.run(run(app_main.app, args.users, args.requests, args.concurrency))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
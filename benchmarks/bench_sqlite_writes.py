@@ -0,0 +1,114 @@
+"""SQLite 쓰기 처리량 벤치마크.
+
+기본 설정과 SQLITE_PRODUCTION=1 (WAL + 그룹 커밋) 을 각각 새 DB 파일에서 실행하고
+주문 생성 / 리뷰 작성 / 결제 처리의 초당 처리량과 에러 수를 JSON 으로 출력한다.
+
+    python benchmarks/bench_sqlite_writes.py --threads 16 --ops 200
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "default": {"SQLITE_PRODUCTION": "0"},
+    "production": {"SQLITE_PRODUCTION": "1"},
+}
+
+
+def run_mode(threads: int, ops: int) -> dict:
+    sys.path.insert(0, ROOT)
+    from benchmarks.stubs import install_s3_stub
+    install_s3_stub()
+
+    import crud, models, schemas, write_batcher
+    from database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = models.User(email="bench@example.com", password="bench")
+    category = models.Category(name="bench")
+    db.add_all([user, category])
+    db.flush()
+    item = models.Item(name="bench", description="bench", price=1000, category_id=category.id)
+    db.add(item)
+    db.flush()
+    db.add(models.ItemRating(item_id=item.id))
+    db.commit()
+    user_id, item_id = user.id, item.id
+    db.close()
+
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        db = SessionLocal()
+        try:
+            for i in range(ops):
+                try:
+                    if i % 3 == 0:
+                        crud.create_review(db, schemas.ReviewSchema(user_id=user_id, item_id=item_id, content="bench", star=i % 5 + 1))
+                    else:
+                        order = crud.create_order(db, schemas.OrderSchema(user_id=user_id, item_id=item_id, price=1000, count=1, pay=False))
+                        if i % 3 == 2:
+                            crud.update_order_payment(db, order.id)
+                except Exception as e:
+                    db.rollback()
+                    with lock:
+                        errors.append(type(e).__name__)
+        finally:
+            db.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    write_batcher.batcher.stop()
+
+    # 결제 처리는 주문 생성과 같은 반복에서 한 번 더 쓰므로 따로 셈
+    writes = threads * (ops + ops // 3)
+    return {
+        "threads": threads,
+        "writes": writes,
+        "seconds": round(elapsed, 3),
+        "writes_per_second": round((writes - len(errors)) / elapsed, 1),
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "batches": write_batcher.batcher.batches,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="스레드당 반복 횟수")
+    parser.add_argument("--mode", choices=sorted(MODES), help="(내부용) 한 가지 모드만 현재 프로세스에서 실행")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.threads, args.ops)))
+        return
+
+    # 엔진과 PRAGMA 는 import 시점에 정해지므로 모드마다 새 프로세스에서 실행
+    results = {}
+    for mode, env in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, **env, DATABASE_URL=f"sqlite:///{tmp}/bench.db")
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--mode", mode, "--threads", str(args.threads), "--ops", str(args.ops)],
+                env=env, cwd=tmp, capture_output=True, text=True, check=True,
+            )
+            results[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import io
+import threading
+
+import boto3
+
+
+# 벤치마크용 메모리 S3 (crud 가 사용하는 메서드만 구현)
+class MemoryS3:
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.lock = threading.Lock()
+        self.next_upload_id = 0
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self.objects[Key] = Body.read() if hasattr(Body, "read") else bytes(Body)
+        return {"ETag": '"stub"'}
+
+    def create_multipart_upload(self, Bucket, Key, **kwargs):
+        with self.lock:
+            self.next_upload_id += 1
+            upload_id = str(self.next_upload_id)
+            self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        self.uploads[UploadId][PartNumber] = Body.read() if hasattr(Body, "read") else bytes(Body)
+        return {"ETag": f'"part-{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+        return {"ETag": '"stub"'}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self.uploads.pop(UploadId, None)
+
+    def get_object(self, Bucket, Key, **kwargs):
+        data = self.objects[Key]
+        return {"Body": io.BytesIO(data), "ContentLength": len(data)}
+
+
+s3 = MemoryS3()
+
+
+# crud 를 import 하기 전에 호출해야 함 (crud 는 import 시점에 S3 클라이언트를 만듦)
+def install_s3_stub():
+    boto3.client = lambda *args, **kwargs: s3
+    return s3
+
+
+# GPU 서버 스텁: 진행 상황 조회는 고정 값을 돌려주고 나머지 요청은 모두 성공으로 응답
+def gpu_stub_handler(request):
+    import httpx
+
+    if request.url.path == "/api/proginfo":
+        return httpx.Response(200, text='{"progress": 50}')
+    return httpx.Response(200, json={"status": "ok"})
+
+
+# 첫 GPU 요청 전에 호출해야 함 (httpx 클라이언트는 처음 쓸 때 만들어짐)
+def install_gpu_stub():
+    import httpx
+    from gpu_client import gpu_client
+
+    gpu_client.transport = httpx.MockTransport(gpu_stub_handler)
+    return gpu_client
@@ -0,0 +1,190 @@
+import csv
+import io
+import json
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+import models, schemas
+import search_index
+from cache import cache
+from crud import review_visible
+from database import SessionLocal
+from http_cache import versions
+
+# 가져오기는 이 개수만큼 모아서 한 번에 INSERT 하고 커밋
+IMPORT_BATCH_SIZE = 1000
+# 내보내기는 id 순으로 이 개수씩 읽어서 흘려보냄
+EXPORT_BATCH_SIZE = 1000
+# 응답에 담는 행 에러 수 (전체 개수는 error_count)
+MAX_REPORTED_ERRORS = 1000
+
+FORMATS = ("ndjson", "csv")
+EXPORT_MODELS = {
+    "items": models.Item,
+    "orders": models.Order,
+    "reviews": models.Review,
+}
+# 숨긴 제품과 그 리뷰는 내보내지 않음 (주문 내역은 숨긴 제품의 주문도 그대로 내보냄)
+EXPORT_FILTERS = {
+    "items": models.Item.deleted_at.is_(None),
+    "reviews": review_visible(),
+}
+# 다른 사용자의 내역이 섞이지 않도록 요청한 사용자의 행만 내보내는 테이블
+OWNER_COLUMNS = {
+    "orders": models.Order.user_id,
+}
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+# 요청한 형식, 없으면 파일 이름으로 판단
+def detect_format(format: str = None, filename: str = None) -> str:
+    if format is None and filename:
+        format = "csv" if filename.lower().endswith(".csv") else "ndjson"
+    format = format or "ndjson"
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    return format
+
+
+# 업로드 파일을 한 줄씩 읽어서 (줄 번호, dict 또는 에러 메시지) 를 돌려줌
+def iter_rows(fileobj, format: str):
+    text_file = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        if format == "csv":
+            reader = csv.DictReader(text_file)
+            for row in reader:
+                # 빈 칸은 값이 없는 것으로 취급
+                yield reader.line_num, {key: value for key, value in row.items() if value not in ("", None)}
+            return
+        for line_no, line in enumerate(text_file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_no, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_no, "Expected a JSON object"
+                continue
+            yield line_no, row
+    except UnicodeDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"File is not valid UTF-8: {e}")
+    finally:
+        # TextIOWrapper 가 닫힐 때 업로드 파일까지 닫지 않도록 분리
+        text_file.detach()
+
+
+def validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+
+
+class ImportReport:
+    def __init__(self):
+        self.inserted = 0
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, line_no: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line_no, "error": message})
+
+    def to_dict(self) -> dict:
+        return {"inserted": self.inserted, "error_count": self.error_count, "errors": self.errors}
+
+
+# 제품 일괄 등록: 한 줄에 제품 하나, 잘못된 줄은 건너뛰고 줄 번호와 함께 보고
+def import_items(db: Session, fileobj, format: str) -> dict:
+    report = ImportReport()
+    batch = []
+    for line_no, row in iter_rows(fileobj, format):
+        if isinstance(row, str):
+            report.error(line_no, row)
+            continue
+        try:
+            item = schemas.ItemImportSchema.model_validate(row)
+        except ValidationError as e:
+            report.error(line_no, validation_message(e))
+            continue
+        batch.append((line_no, item.model_dump()))
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            insert_items(db, batch, report)
+            batch = []
+    if batch:
+        insert_items(db, batch, report)
+    return report.to_dict()
+
+
+def insert_items(db: Session, batch, report: ImportReport):
+    try:
+        _insert_items(db, [values for _, values in batch])
+        db.commit()
+        report.inserted += len(batch)
+    except Exception:
+        db.rollback()
+        # 묶음이 실패하면 한 줄씩 다시 넣어서 실패한 줄만 보고
+        for line_no, values in batch:
+            try:
+                _insert_items(db, [values])
+                db.commit()
+                report.inserted += 1
+            except Exception as e:
+                db.rollback()
+                report.error(line_no, str(getattr(e, "orig", e)))
+    items_added({values["category_id"] for _, values in batch})
+
+
+def _insert_items(db: Session, rows):
+    ids = db.scalars(insert(models.Item).returning(models.Item.id, sort_by_parameter_order=True), rows).all()
+    db.execute(insert(models.ItemRating), [{"item_id": item_id} for item_id in ids])
+    search_index.index_rows(db, [models.Item(id=item_id, **values) for item_id, values in zip(ids, rows)])
+
+
+# 새 제품은 제품 단위 캐시가 없으므로 카테고리 목록 캐시와 ETag 버전만 갱신
+def items_added(category_ids):
+    for category_id in category_ids:
+        cache.invalidate_generation(f"category:{category_id}")
+    versions.bump("items", *[f"category:{category_id}" for category_id in category_ids])
+
+
+# 테이블 내보내기: id 순으로 나눠 읽으므로 테이블 크기와 관계없이 메모리 사용량이 일정함
+# 응답을 흘려보내는 동안 요청의 세션은 이미 닫혀 있을 수 있으므로 세션을 따로 염
+def export_rows(table: str, format: str, user_id: int = None):
+    model = EXPORT_MODELS[table]
+    columns = list(model.__table__.columns)
+    db = SessionLocal()
+    try:
+        if format == "csv":
+            yield csv_line([column.name for column in columns])
+        last_id = None
+        while True:
+            query = select(*columns).order_by(model.id).limit(EXPORT_BATCH_SIZE)
+            if table in EXPORT_FILTERS:
+                query = query.filter(EXPORT_FILTERS[table])
+            if table in OWNER_COLUMNS:
+                query = query.filter(OWNER_COLUMNS[table] == user_id)
+            if last_id is not None:
+                query = query.filter(model.id > last_id)
+            rows = db.execute(query).mappings().all()
+            if not rows:
+                break
+            if format == "csv":
+                yield "".join(csv_line(row.values()) for row in rows)
+            else:
+                yield "".join(json.dumps(dict(row), ensure_ascii=False, default=str) + "\n" for row in rows)
+            last_id = rows[-1]["id"]
+    finally:
+        db.close()
+
+
+def csv_line(values) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
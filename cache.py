@@ -0,0 +1,155 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+DEFAULT_TTL = 60
+MAX_ENTRIES = 10000
+
+
+# 프로세스 내 캐시 (TTL 만료 + LRU 제거)
+class MemoryBackend:
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        # 세대 카운터는 LRU 로 지워지면 안 되므로 따로 보관
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: float):
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self.lock:
+            self.counters[key] += 1
+            return self.counters[key]
+
+    def counter(self, key: str) -> int:
+        with self.lock:
+            return self.counters.get(key, 0)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.counters.clear()
+
+
+# Redis 호환 클라이언트(get/set(ex=)/delete/incr)를 쓰는 캐시
+class RedisBackend:
+    def __init__(self, client, prefix: str = "ccrc:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str):
+        raw = self.client.get(self.prefix + key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key: str, value, ttl: float):
+        self.client.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    def delete(self, *keys: str):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + "counter:" + key))
+
+    def counter(self, key: str) -> int:
+        raw = self.client.get(self.prefix + "counter:" + key)
+        return int(raw) if raw is not None else 0
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class Cache:
+    def __init__(self, backend, default_ttl: float = DEFAULT_TTL):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    # 페이지 목록처럼 키를 하나씩 지우기 어려운 캐시는 세대 번호를 키에 넣고, 세대를 올려서 한 번에 무효화
+    def _key(self, namespace: str, key, generational: bool) -> str:
+        if generational:
+            return f"{namespace}@{self.backend.counter(namespace)}:{key}"
+        return f"{namespace}:{key}"
+
+    # 캐시에 없으면 loader 로 읽어서 저장 (None 은 캐시하지 않음)
+    def get_or_load(self, namespace: str, key, loader, ttl: float = None, generational: bool = False):
+        cache_key = self._key(namespace, key, generational)
+        value = self.backend.get(cache_key)
+        if value is not None:
+            self.hits[namespace.split(":")[0]] += 1
+            return value
+        self.misses[namespace.split(":")[0]] += 1
+        value = loader()
+        if value is not None:
+            self.backend.set(cache_key, value, ttl or self.default_ttl)
+        return value
+
+    # 비동기 loader 용 get_or_load
+    async def aget_or_load(self, namespace: str, key, loader, ttl: float = None, generational: bool = False):
+        cache_key = self._key(namespace, key, generational)
+        value = self.backend.get(cache_key)
+        if value is not None:
+            self.hits[namespace.split(":")[0]] += 1
+            return value
+        self.misses[namespace.split(":")[0]] += 1
+        value = await loader()
+        if value is not None:
+            self.backend.set(cache_key, value, ttl or self.default_ttl)
+        return value
+
+    def invalidate(self, namespace: str, *keys):
+        self.backend.delete(*[self._key(namespace, key, False) for key in keys])
+
+    def invalidate_generation(self, namespace: str):
+        self.backend.incr(namespace)
+
+    def stats(self) -> dict:
+        namespaces = sorted(set(self.hits) | set(self.misses))
+        total_hits = sum(self.hits.values())
+        total = total_hits + sum(self.misses.values())
+        return {
+            "hits": total_hits,
+            "misses": total - total_hits,
+            "hit_ratio": total_hits / total if total else 0.0,
+            "namespaces": {
+                name: {"hits": self.hits[name], "misses": self.misses[name]} for name in namespaces
+            },
+        }
+
+
+def create_backend():
+    redis_url = os.environ.get("CACHE_REDIS_URL")
+    if redis_url:
+        import redis
+        return RedisBackend(redis.Redis.from_url(redis_url))
+    return MemoryBackend()
+
+
+cache = Cache(create_backend())
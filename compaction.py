@@ -0,0 +1,131 @@
+import asyncio
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import job_queue
+import models
+import search_index
+from cache import cache
+from database import SessionLocal
+from http_cache import versions
+
+# 카테고리 정리: 제품은 deleted_at 만 설정해서 바로 숨기고, 실제 삭제는 작업 큐에서 조금씩 진행
+# (한 트랜잭션이 SQLite 쓰기 잠금을 오래 잡아서 주문/리뷰 쓰기가 멈추지 않도록)
+
+# 트랜잭션 하나에서 지우는 제품 수 / 리뷰 수
+ITEM_BATCH_SIZE = int(os.environ.get("COMPACTION_ITEM_BATCH", "200"))
+REVIEW_BATCH_SIZE = int(os.environ.get("COMPACTION_REVIEW_BATCH", "1000"))
+# 트랜잭션 사이에 쉬는 시간(초), 그 사이에 다른 쓰기가 잠금을 가져감
+PAUSE = float(os.environ.get("COMPACTION_PAUSE", "0.05"))
+
+JOB_KIND = "compact_items"
+# DELETE /api/category 가 비우는 카테고리
+OTHER_CATEGORY_NAME = "기타"
+
+
+# 카테고리의 제품을 숨기고 정리 작업 등록 (UPDATE 한 번이라 큰 카테고리도 금방 끝남)
+def soft_delete_category_items(db: Session, category_id: int) -> dict:
+    query = (
+        update(models.Item)
+        .where(models.Item.category_id == category_id, models.Item.deleted_at.is_(None))
+        .values(deleted_at=datetime.utcnow())
+        .returning(models.Item.id)
+    )
+    item_ids = [row.id for row in db.execute(query, execution_options={"synchronize_session": False})]
+    # 검색은 색인 결과로 페이지를 나누므로 색인에서 바로 빼야 페이지 크기가 맞음
+    search_index.remove_items(db, item_ids)
+    db.commit()
+    items_hidden(item_ids, category_id)
+    db_job = enqueue_compaction(db) if item_ids else None
+    return {"category_id": category_id, "deleted": len(item_ids), "job_id": db_job.id if db_job else None}
+
+
+def soft_delete_other_category_items(db: Session) -> dict:
+    category_id = db.query(models.Category.id).filter(models.Category.name == OTHER_CATEGORY_NAME).scalar()
+    if category_id is None:
+        return {"category_id": None, "deleted": 0, "job_id": None}
+    return soft_delete_category_items(db, category_id)
+
+
+def items_hidden(item_ids, category_id: int):
+    if not item_ids:
+        return
+    cache.invalidate("item", *item_ids)
+    # 숨긴 제품의 리뷰도 목록에서 빠지므로 리뷰 캐시/버전도 같이 무효화
+    cache.invalidate("reviews:item", *item_ids)
+    for item_id in item_ids:
+        cache.invalidate_generation(f"detail:{item_id}")
+    cache.invalidate_generation(f"category:{category_id}")
+    versions.bump("items", f"category:{category_id}", *[f"item:{item_id}" for item_id in item_ids])
+    versions.bump("reviews", *[f"reviews:item:{item_id}" for item_id in item_ids])
+
+
+# 정리할 때마다 새 작업 (작업은 숨겨진 제품 전체를 훑으므로 앞 작업이 이미 지웠으면 할 일 없이 끝남)
+def enqueue_compaction(db: Session):
+    return job_queue.enqueue(db, JOB_KIND, f"{JOB_KIND}:{datetime.utcnow().isoformat()}", max_attempts=3)
+
+
+# 숨겨진 제품 한 묶음 정리, 다음 묶음의 시작 id 를 돌려줌 (더 없으면 None)
+# 리뷰/별점/검색 색인/대기 중인 작업은 지우고, 주문이 있는 제품은 주문 내역이 가리킬 수 있도록 숨긴 채로 남김
+def compact_batch(after_id: int = 0, pause: float = PAUSE):
+    db = SessionLocal()
+    try:
+        item_ids = db.scalars(
+            select(models.Item.id)
+            .where(models.Item.deleted_at.isnot(None), models.Item.id > after_id)
+            .order_by(models.Item.id)
+            .limit(ITEM_BATCH_SIZE)
+        ).all()
+        if not item_ids:
+            return None
+
+        # 리뷰가 많은 제품도 있으므로 리뷰는 따로 나눠서 지움
+        while True:
+            review_ids = db.scalars(
+                select(models.Review.id).where(models.Review.item_id.in_(item_ids)).limit(REVIEW_BATCH_SIZE)
+            ).all()
+            if not review_ids:
+                break
+            db.execute(delete(models.Review).where(models.Review.id.in_(review_ids)))
+            db.commit()
+            time.sleep(pause)
+
+        ordered = set(db.scalars(select(models.Order.item_id).where(models.Order.item_id.in_(item_ids)).distinct()))
+        removable = [item_id for item_id in item_ids if item_id not in ordered]
+        db.execute(delete(models.ItemRating).where(models.ItemRating.item_id.in_(item_ids)))
+        db.execute(delete(models.Job).where(models.Job.item_id.in_(item_ids), models.Job.status == "queued"))
+        db.execute(update(models.Job).where(models.Job.item_id.in_(removable)).values(item_id=None))
+        search_index.remove_items(db, item_ids)
+        db.execute(delete(models.Item).where(models.Item.id.in_(removable)))
+        db.commit()
+    finally:
+        db.close()
+
+    cache.invalidate("reviews:item", *item_ids)
+    versions.bump("reviews", *[f"reviews:item:{item_id}" for item_id in item_ids])
+    return item_ids[-1]
+
+
+@job_queue.handler(JOB_KIND)
+async def compact_items(payload: dict):
+    after_id = 0
+    while after_id is not None:
+        after_id = await run_in_threadpool(compact_batch, after_id)
+        await asyncio.sleep(PAUSE)
+
+
+# 서버 없이 바로 정리 (manage.py)
+def compact(pause: float = PAUSE) -> int:
+    batches = 0
+    after_id = 0
+    while True:
+        after_id = compact_batch(after_id, pause)
+        if after_id is None:
+            return batches
+        batches += 1
+        time.sleep(pause)
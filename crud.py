@@ -1,48 +1,174 @@
 import os
+import tempfile
 from fastapi import HTTPException, UploadFile
-from sqlalchemy.orm import Session
+from collections import defaultdict
+
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 import models, schemas
 import uuid
-import requests
+import httpx
 
 import boto3
 from urllib.parse import urlparse
+from starlette.concurrency import run_in_threadpool
+
+import s3_upload
+import pagination
+import search_index
+from cache import cache
+from http_cache import versions
+import auth
+import image_variants
+import media_store
+import metrics
+import splat_convert
+import job_queue
+import passwords
+import write_batcher
+from gpu_client import gpu_client, CircuitOpenError
+from websocket import progress_hub
+from database import SessionLocal
 
 import json
 
+# presigned 업로드 티켓의 토큰 종류
+UPLOAD_TICKET = "upload"
+
+# 목록 API 에서 허용하는 정렬 키
+USER_SORTS = {"id": models.User.id}
+ITEM_SORTS = {"id": models.Item.id, "price": models.Item.price, "rating": models.ItemRating.star_avg}
+REVIEW_SORTS = {"id": models.Review.id}
+
 # ID로 사용자 찾기
 def get_user_by_email(db: Session, email: str):
     return db.query(models.User).filter(models.User.email == email).first()
 
 # 모든 사용자 찾기
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = db.query(models.User)
+    return pagination.apply(query, models.User, "id", USER_SORTS, cursor=cursor, skip=skip, limit=limit).all()
 
 def get_user_by_id(db: Session, user_id: int):
     return db.query(models.User).filter(models.User.id == user_id).first()
 
 # 사용자 생성
 def create_user(db: Session, user: schemas.UserSchema):
-    db_user = models.User(email=user.email, password=user.password)
+    db_user = models.User(email=user.email, password=passwords.hash_password(user.password))
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     return db_user
 
-# 비밀번호 일치 확인
-def verify_password(plain_password, hashed_password):
-    return plain_password == hashed_password
+# 로그인할 때 평문/예전 설정의 비밀번호를 새 해시로 바꿈
+def update_password_hash(db: Session, user_id: int, password_hash: str):
+    db.query(models.User).filter(models.User.id == user_id).update({models.User.password: password_hash}, synchronize_session=False)
+    db.commit()
 
 # 모든 제품 목록 불러오기
-def get_items(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Item).offset(skip).limit(limit).all()
+# 제품 목록 기본 쿼리 (별점 정렬/필터가 있으면 리뷰 통계 테이블을 조인)
+# 동기/비동기 세션에서 같이 쓰도록 select 문으로 만듦
+def item_list_query(sort: str = "id", min_stars: float = None):
+    query = select(models.Item).filter(models.Item.deleted_at.is_(None))
+    if sort.lstrip("-") == "rating" or min_stars is not None:
+        query = query.outerjoin(models.ItemRating, models.ItemRating.item_id == models.Item.id)
+    if min_stars is not None:
+        query = query.filter(models.ItemRating.star_avg >= min_stars)
+    return query
+
+# 목록 응답용 컬럼만 고르는 조회 (ORM 객체와 응답 모델 검증 없이 바로 dict 로 바꿈)
+ITEM_ROW_COLUMNS = (
+    models.Item.id, models.Item.name, models.Item.description, models.Item.price, models.Item.category_id,
+    models.Item.image, models.Item.image_thumb, models.Item.image_medium, models.Item.splat,
+    models.Item.splat_compressed, models.Item.video, models.Item.stock,
+    models.ItemRating.review_count, models.ItemRating.star_avg.label("rating"),
+    models.ItemRating.star_1, models.ItemRating.star_2, models.ItemRating.star_3, models.ItemRating.star_4, models.ItemRating.star_5,
+)
+REVIEW_ROW_COLUMNS = (models.Review.id, models.Review.content, models.Review.star, models.Review.user_id, models.Review.item_id)
+
+def item_rows_query(skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id", min_stars: float = None):
+    query = (
+        select(*ITEM_ROW_COLUMNS)
+        .outerjoin(models.ItemRating, models.ItemRating.item_id == models.Item.id)
+        .filter(models.Item.deleted_at.is_(None))
+    )
+    if min_stars is not None:
+        query = query.filter(models.ItemRating.star_avg >= min_stars)
+    return pagination.apply(query, models.Item, sort, ITEM_SORTS, cursor=cursor, skip=skip, limit=limit)
+
+# 숨긴 제품의 리뷰는 정리 작업이 지울 때까지 보이지 않도록 거르는 조건 (제품이 없는 리뷰는 그대로 보임)
+def review_visible():
+    return ~select(models.Item.id).where(models.Item.id == models.Review.item_id, models.Item.deleted_at.isnot(None)).exists()
+
+def review_rows_query(skip: int = 0, limit: int = 100, cursor: str = None):
+    query = select(*REVIEW_ROW_COLUMNS).where(review_visible())
+    return pagination.apply(query, models.Review, "id", REVIEW_SORTS, cursor=cursor, skip=skip, limit=limit)
+
+# ItemResponseModel 과 같은 모양의 dict (image_column 이 있으면 그 변형으로 image 를 바꿈)
+def item_row_to_dict(row, image_column: str = None):
+    return {
+        "id": row.id,
+        "name": row.name,
+        "description": row.description,
+        "price": float(row.price) if row.price is not None else None,
+        "category_id": row.category_id,
+        "image": (getattr(row, image_column) or row.image) if image_column else row.image,
+        "image_thumb": row.image_thumb,
+        "image_medium": row.image_medium,
+        "splat": row.splat,
+        "splat_compressed": row.splat_compressed,
+        "video": row.video,
+        "stock": row.stock,
+        "review_count": row.review_count or 0,
+        "rating": row.rating,
+        "star_histogram": [row.star_1 or 0, row.star_2 or 0, row.star_3 or 0, row.star_4 or 0, row.star_5 or 0],
+    }
+
+# ReviewSchema 와 같은 모양의 dict
+def review_row_to_dict(row):
+    return {"id": row.id, "content": row.content, "star": row.star, "user_id": row.user_id, "item_id": row.item_id}
+
+def get_items(db: Session, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id", min_stars: float = None):
+    query = item_list_query(sort, min_stars)
+    return db.scalars(pagination.apply(query, models.Item, sort, ITEM_SORTS, cursor=cursor, skip=skip, limit=limit)).all()
 
 def get_item_by_id(db: Session, item_id: int):
     return db.query(models.Item).filter(models.Item.id == item_id).first()
 
-# ID로 제품 불러오기 (상세 보기)
+# ID로 제품 불러오기 (상세 보기, 삭제된 제품은 없는 것으로 취급)
 def get_item(db: Session, item_id: int):
-    return db.query(models.Item).filter(models.Item.id == item_id).first()
+    return db.query(models.Item).filter(models.Item.id == item_id, models.Item.deleted_at.is_(None)).first()
+
+# 동영상 UUID로 제품 찾기
+def get_item_by_video_uuid(db: Session, video_uuid: str):
+    return db.query(models.Item).filter(models.Item.video.like(f"%/{video_uuid}.%")).first()
+
+# 캐시용 dict 변환
+def item_to_dict(db_item):
+    if db_item is None:
+        return None
+    return schemas.ItemResponseModel.model_validate(db_item, from_attributes=True).model_dump()
+
+def review_to_dict(db_review):
+    return schemas.ReviewSchema.model_validate(db_review, from_attributes=True).model_dump()
+
+# 캐시된 제품 상세 (ItemResponseModel 형태의 dict)
+def get_item_cached(db: Session, item_id: int):
+    return cache.get_or_load("item", item_id, lambda: item_to_dict(get_item(db, item_id)))
+
+# 제품이 바뀌었을 때 제품 캐시와 해당 카테고리 목록 캐시를 무효화하고 ETag 버전을 올림
+def item_changed(item_id: int, category_id: int = None):
+    cache.invalidate("item", item_id)
+    cache.invalidate_generation(f"category:{category_id}")
+    cache.invalidate_generation(f"detail:{item_id}")
+    versions.bump("items", f"item:{item_id}", f"category:{category_id}")
+
+# 리뷰가 바뀌었을 때
+def review_changed(item_id: int):
+    cache.invalidate("reviews:item", item_id)
+    cache.invalidate_generation(f"detail:{item_id}")
+    versions.bump("reviews", f"reviews:item:{item_id}")
 
 # 제품 생성
 def create_item(db: Session, item: schemas.ItemSchema, image_path: str, video_path: str):
@@ -53,17 +179,40 @@ def create_item(db: Session, item: schemas.ItemSchema, image_path: str, video_pa
         video=video_path,
         description=item.description,
         price=item.price,
+        stock=item.stock,
         category_id=item.category_id
     )
     db.add(db_item)
+    db.flush()
+    db.add(models.ItemRating(item_id=db_item.id))
+    search_index.index_item(db, db_item)
     db.commit()
     db.refresh(db_item)
+    item_changed(db_item.id, db_item.category_id)
+    return db_item
+
+
+# 제품 등록 후 GPU 전송/이미지 변형 작업 등록 (동기 DB 작업이라 비동기 핸들러에서는 스레드풀에서 호출)
+def create_item_with_jobs(db: Session, item: schemas.ItemSchema, image_path: str, video_path: str):
+    db_item = create_item(db, item, image_path, video_path)
+    send_video(db, db_item.id)
+    enqueue_image_variants(db, db_item.id)
+    db.refresh(db_item)
     return db_item
 
 
 # 카테고리 별 제품 목록
-def get_items_by_category(db: Session, category_id: int, skip: int = 0, limit: int = 100):
-    return db.query(models.Item).filter(models.Item.category_id == category_id).offset(skip).limit(limit).all()
+def get_items_by_category(db: Session, category_id: int, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id"):
+    query = item_list_query(sort).filter(models.Item.category_id == category_id)
+    return db.scalars(pagination.apply(query, models.Item, sort, ITEM_SORTS, cursor=cursor, skip=skip, limit=limit)).all()
+
+# 캐시된 카테고리 별 제품 목록 (카테고리의 제품이 바뀌면 세대가 올라가서 페이지 전체가 무효화됨)
+def get_items_by_category_cached(db: Session, category_id: int, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id"):
+    return cache.get_or_load(
+        f"category:{category_id}", f"{sort}:{skip}:{limit}:{cursor}",
+        lambda: [item_to_dict(item) for item in get_items_by_category(db, category_id, skip, limit, cursor, sort)],
+        generational=True,
+    )
 
 # 카테고리 생성
 def create_item_category(db: Session, category: schemas.CategorySchema):
@@ -73,8 +222,16 @@ def create_item_category(db: Session, category: schemas.CategorySchema):
     db.refresh(db_category)
     return db_category
 
+# 제품 명/설명 검색 (FTS5 색인 관련도 순, 색인을 쓸 수 없으면 ilike)
 def search_items_by_name(db: Session, name: str, skip: int = 0, limit: int = 100):
-    return db.query(models.Item).filter(models.Item.name.ilike(f"%{name}%")).offset(skip).limit(limit).all()
+    if not search_index.enabled:
+        query = db.query(models.Item).filter(models.Item.name.ilike(f"%{name}%"), models.Item.deleted_at.is_(None))
+        return query.order_by(models.Item.id).offset(skip).limit(limit).all()
+    # 삭제할 때 색인에서도 빼지만, 그 사이에 색인된 행이 있어도 보이지 않도록 한 번 더 거름
+    item_ids = search_index.search(db, name, skip=skip, limit=limit)
+    query = db.query(models.Item).filter(models.Item.id.in_(item_ids), models.Item.deleted_at.is_(None))
+    items = {item.id: item for item in query.all()}
+    return [items[item_id] for item_id in item_ids if item_id in items]
 
 # 데이터 삭제하기 - 제품 카테고리
 def delete_item_category(db: Session, item_id: int, category_id: int):
@@ -86,28 +243,221 @@ def delete_item_category(db: Session, item_id: int, category_id: int):
     return Item
 
 # 리뷰 조회
-def get_reviews(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Review).offset(skip).limit(limit).all()
+def get_reviews(db: Session, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = db.query(models.Review).filter(review_visible())
+    return pagination.apply(query, models.Review, "id", REVIEW_SORTS, cursor=cursor, skip=skip, limit=limit).all()
 
 # 리뷰 생성
 def create_review(db: Session, review: schemas.ReviewSchema):
-    db_review = models.Review(user_id=review.user_id, item_id=review.item_id, content=review.content, star=review.star)
-    db.add(db_review)
+    if write_batcher.enabled:
+        db_review, _ = write_batcher.batcher.run(add_review, review, after_commit=review_added)
+        return db_review
+    db_review, category_id = add_review(db, review)
     db.commit()
     db.refresh(db_review)
+    review_added((db_review, category_id))
     return db_review
 
+# 리뷰 추가 (커밋은 호출한 쪽에서, 쓰기 배치에서도 사용)
+def add_review(db: Session, review: schemas.ReviewSchema):
+    db_review = models.Review(user_id=review.user_id, item_id=review.item_id, content=review.content, star=review.star)
+    db.add(db_review)
+    add_review_to_rating(db, review.item_id, review.star)
+    db.flush()
+    category_id = db.query(models.Item.category_id).filter(models.Item.id == review.item_id).scalar()
+    return db_review, category_id
+
+def review_added(result):
+    db_review, category_id = result
+    review_changed(db_review.item_id)
+    item_changed(db_review.item_id, category_id)
+
+# 리뷰 통계 갱신 (SET 의 우변은 갱신 전 값이라 평균을 한 문장으로 계산할 수 있음)
+def add_review_to_rating(db: Session, item_id: int, star: int):
+    rating = models.ItemRating
+    values = {
+        rating.review_count: rating.review_count + 1,
+        rating.star_sum: rating.star_sum + star,
+        rating.star_avg: (rating.star_sum + star) * 1.0 / (rating.review_count + 1),
+    }
+    if 1 <= star <= 5:
+        column = getattr(rating, f"star_{star}")
+        values[column] = column + 1
+    updated = db.query(rating).filter(rating.item_id == item_id).update(values, synchronize_session=False)
+    if not updated:
+        db_rating = rating(item_id=item_id, review_count=1, star_sum=star, star_avg=float(star))
+        if 1 <= star <= 5:
+            setattr(db_rating, f"star_{star}", 1)
+        db.add(db_rating)
+
+# 리뷰 테이블에서 통계 전체를 다시 계산 (기존 데이터 채우기용)
+def rebuild_item_ratings(db: Session) -> int:
+    review = models.Review
+    stars = [func.sum(case((review.star == star, 1), else_=0)) for star in range(1, 6)]
+    select_stats = (
+        select(
+            models.Item.id,
+            func.count(review.id),
+            func.coalesce(func.sum(review.star), 0),
+            func.avg(review.star),
+            *[func.coalesce(column, 0) for column in stars],
+        )
+        .outerjoin(review, review.item_id == models.Item.id)
+        .group_by(models.Item.id)
+    )
+    rating = models.ItemRating
+    db.query(rating).delete(synchronize_session=False)
+    db.execute(insert(rating).from_select(
+        ["item_id", "review_count", "star_sum", "star_avg", "star_1", "star_2", "star_3", "star_4", "star_5"],
+        select_stats,
+    ))
+    db.commit()
+    return db.query(rating).count()
+
 # 제품별 리뷰 불러오기
 def get_item_reviews(db: Session, item_id: int):
-    return db.query(models.Review).filter(models.Review.item_id == item_id).all()
+    return db.query(models.Review).filter(models.Review.item_id == item_id, review_visible()).all()
+
+# 제품 상세 페이지용 묶음 조회: 제품 + 카테고리 + 리뷰 통계를 한 쿼리로, 리뷰 목록은 페이지 단위로
+def get_item_detail(db: Session, item_id: int, review_limit: int = 10, review_cursor: str = None):
+    db_item = (
+        db.query(models.Item)
+        .options(joinedload(models.Item.category))
+        .filter(models.Item.id == item_id, models.Item.deleted_at.is_(None))
+        .first()
+    )
+    if db_item is None:
+        return None
 
-# 주문 생성
-def create_order(db: Session, order: schemas.OrderSchema):
-    db_order = models.Order(user_id=order.user_id, item_id=order.item_id, price=order.price, count=order.count, pay=order.pay)
-    db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+    query = db.query(models.Review).filter(models.Review.item_id == item_id)
+    reviews = pagination.apply(query, models.Review, "-id", REVIEW_SORTS, cursor=review_cursor, limit=review_limit).all()
+    return item_detail_to_dict(db_item, reviews, review_limit)
+
+def item_detail_to_dict(db_item, reviews, review_limit: int):
+    category = db_item.category
+    return {
+        "item": item_to_dict(db_item),
+        "category": {"id": category.id, "name": category.name} if category else None,
+        "media": {"image": db_item.image, "video": db_item.video, "splat": db_item.splat},
+        "reviews": [review_to_dict(review) for review in reviews],
+        "review_count": db_item.review_count,
+        "star_avg": db_item.rating,
+        "next_review_cursor": pagination.next_cursor(reviews, "-id", review_limit),
+    }
+
+def get_item_detail_cached(db: Session, item_id: int, review_limit: int = 10, review_cursor: str = None):
+    return cache.get_or_load(
+        f"detail:{item_id}", f"{review_limit}:{review_cursor}",
+        lambda: get_item_detail(db, item_id, review_limit, review_cursor),
+        generational=True,
+    )
+
+def get_item_reviews_cached(db: Session, item_id: int):
+    return cache.get_or_load(
+        "reviews:item", item_id, lambda: [review_to_dict(review) for review in get_item_reviews(db, item_id)]
+    )
+
+# 주문 생성 (한 제품)
+def create_order(db: Session, order: schemas.OrderSchema, idempotency_key: str = None):
+    return place_order(db, order.user_id, [order], idempotency_key)[0]
+
+# 장바구니 주문: 모든 줄을 한 트랜잭션으로 처리하고, 같은 멱등 키로 다시 요청하면 처음 만든 주문을 돌려줌
+def place_order(db: Session, user_id: int, lines, idempotency_key: str = None):
+    if write_batcher.enabled:
+        orders, _ = write_batcher.batcher.run(add_orders, user_id, lines, idempotency_key, after_commit=orders_placed)
+        return orders
+    try:
+        result = add_orders(db, user_id, lines, idempotency_key)
+        db.commit()
+    except write_batcher.Rejected as e:
+        db.rollback()
+        raise e.error
+    except IntegrityError:
+        # 같은 키로 동시에 들어온 요청이 먼저 커밋된 경우
+        db.rollback()
+        request = db.query(models.OrderRequest).filter(models.OrderRequest.key == idempotency_key).first() if idempotency_key else None
+        if request is None or request.user_id != user_id:
+            raise
+        return sorted(request.orders, key=lambda order: order.id)
+    orders_placed(result)
+    return result[0]
+
+# 주문 추가 (커밋은 호출한 쪽에서, 쓰기 배치에서도 사용)
+# 가격은 서버에서 계산하고, 재고는 조건부 UPDATE 한 번으로 확인과 차감을 같이 해서 행을 먼저 읽어 잠그지 않음
+def add_orders(db: Session, user_id: int, lines, idempotency_key: str = None):
+    if idempotency_key is not None:
+        request = db.query(models.OrderRequest).filter(models.OrderRequest.key == idempotency_key).first()
+        if request is not None:
+            if request.user_id != user_id:
+                raise write_batcher.Rejected(HTTPException(status_code=409, detail="Idempotency key already used"))
+            return sorted(request.orders, key=lambda order: order.id), []
+    if not lines:
+        raise write_batcher.Rejected(HTTPException(status_code=400, detail="Empty order"))
+
+    # 같은 제품은 합치고 item_id 순서로 차감 (동시에 들어온 장바구니끼리 교착되지 않도록)
+    counts = defaultdict(int)
+    for line in lines:
+        if line.count <= 0:
+            raise write_batcher.Rejected(HTTPException(status_code=400, detail="Order count must be positive"))
+        counts[line.item_id] += line.count
+
+    reserved = []
+    for item_id in sorted(counts):
+        row = reserve_stock(db, item_id, counts[item_id])
+        if row is None:
+            # 앞에서 차감한 재고를 되돌려서 세션에 변경이 남지 않게 함
+            for reserved_id, count, _ in reserved:
+                release_stock(db, reserved_id, count)
+            raise write_batcher.Rejected(order_rejection(db, item_id))
+        reserved.append((item_id, counts[item_id], row))
+
+    request_id = None
+    if idempotency_key is not None:
+        request = models.OrderRequest(key=idempotency_key, user_id=user_id)
+        db.add(request)
+        db.flush()
+        request_id = request.id
+    # 제품 등록 폼은 가격을 실수로 받으므로 (SQLite 는 그대로 저장) 주문 가격은 Integer 컬럼에 맞게 반올림
+    orders = [
+        models.Order(user_id=user_id, item_id=item_id, price=round(row.price * count), count=count, pay=False, request_id=request_id)
+        for item_id, count, row in reserved
+    ]
+    db.add_all(orders)
+    db.flush()
+    # 재고를 관리하는 제품만 캐시를 무효화
+    changed = [(item_id, row.category_id) for item_id, _, row in reserved if row.stock is not None]
+    return orders, changed
+
+def orders_placed(result):
+    for item_id, category_id in result[1]:
+        item_changed(item_id, category_id)
+
+# 재고가 충분할 때만 차감하고 (가격, 남은 재고, 카테고리) 를 돌려줌, 차감하지 못하면 None
+def reserve_stock(db: Session, item_id: int, count: int):
+    query = (
+        update(models.Item)
+        .where(
+            models.Item.id == item_id,
+            models.Item.deleted_at.is_(None),
+            models.Item.price.isnot(None),
+            or_(models.Item.stock.is_(None), models.Item.stock >= count),
+        )
+        .values(stock=models.Item.stock - count)
+        .returning(models.Item.price, models.Item.stock, models.Item.category_id)
+    )
+    return db.execute(query, execution_options={"synchronize_session": False}).first()
+
+def release_stock(db: Session, item_id: int, count: int):
+    query = update(models.Item).where(models.Item.id == item_id, models.Item.stock.isnot(None)).values(stock=models.Item.stock + count)
+    db.execute(query, execution_options={"synchronize_session": False})
+
+def order_rejection(db: Session, item_id: int):
+    item = db.query(models.Item.price).filter(models.Item.id == item_id, models.Item.deleted_at.is_(None)).first()
+    if item is None:
+        return HTTPException(status_code=404, detail=f"Item {item_id} not found")
+    if item.price is None:
+        return HTTPException(status_code=409, detail=f"Item {item_id} is not for sale")
+    return HTTPException(status_code=409, detail=f"Item {item_id} is out of stock")
 
 def get_orders_by_user(db: Session, user_id: int):
     return db.query(models.Order).filter(models.Order.user_id == user_id).all()
@@ -116,14 +466,22 @@ def get_orders_by_item(db: Session, item_id: int):
     return db.query(models.Order).filter(models.Order.item_id == item_id).all()
 
 def update_order_payment(db: Session, order_id: int):
-    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    if write_batcher.enabled:
+        return write_batcher.batcher.run(mark_order_paid, order_id)
+    db_order = mark_order_paid(db, order_id)
     if db_order:
-        db_order.pay = True
         db.commit()
         db.refresh(db_order)
         return db_order
     return None
 
+def mark_order_paid(db: Session, order_id: int):
+    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
+    if db_order:
+        db_order.pay = True
+        db.flush()
+    return db_order
+
 async def save_upload_file(file: UploadFile, folder: str):
     unique_filename = str(uuid.uuid4())
     file_extension = os.path.splitext(file.filename)[-1].lower()
@@ -134,49 +492,271 @@ async def save_upload_file(file: UploadFile, folder: str):
 
     return file_path
 
+# 로컬 S3 호환 서버(MinIO 등)를 쓸 때 지정
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL")
 s3_client = boto3.client(
     service_name='s3', region_name='',
-    aws_access_key_id='', aws_secret_access_key=""
+    aws_access_key_id='', aws_secret_access_key="",
+    endpoint_url=S3_ENDPOINT_URL
 )
+metrics.instrument_boto3(s3_client)
 bucket_name = ""
-# GPU 서버 API 호출
+
+# 미디어 스트리밍 저장소 (MEDIA_ROOT 를 지정하면 로컬 디렉터리)
+media_backend = media_store.create_backend(s3_client, bucket_name)
+# /api/items/{id}/media/{kind} 로 받을 수 있는 제품 필드
+MEDIA_KINDS = ("video", "splat", "splat_compressed")
+# GPU 서버가 만든 .ply 를 웹 뷰어용 .splat 으로 변환할지 여부
+SPLAT_CONVERT = os.environ.get("SPLAT_CONVERT", "1") == "1"
+
+def s3_object_url(s3_key: str) -> str:
+    if S3_ENDPOINT_URL:
+        return f"{S3_ENDPOINT_URL.rstrip('/')}/{bucket_name}/{s3_key}"
+    return f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
+
+# 동영상 URL에서 video_uuid 추출
+def get_video_uuid(video_url: str) -> str:
+    parsed_url = urlparse(video_url)
+    path_components = parsed_url.path.split('/')
+    file_name = path_components[-1]
+    return file_name.split('.')[0]
+
+# GPU 서버 전송 작업 등록 (video_uuid 기준으로 한 번만 등록됨)
 def send_video(db: Session, item_id: int):
+    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+    if not db_item or not db_item.video:
+        return None
+    video_uuid = get_video_uuid(db_item.video)
+    return job_queue.enqueue(
+        db, "send_video", f"send_video:{video_uuid}",
+        {"item_id": item_id, "video_uuid": video_uuid}, item_id=item_id
+    )
+
+# GPU 서버 API 호출 (작업 큐 워커에서 실행)
+@job_queue.handler("send_video")
+async def dispatch_video(payload: dict):
+    item_id, video_uuid = payload["item_id"], payload["video_uuid"]
     try:
-        db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
-        server_url = 'http://163.180.117.43:9003/api/downloadvideo'
-
-        parsed_url = urlparse(db_item.video)
-        path_components = parsed_url.path.split('/')
-        file_name = path_components[-1]
-        file_name_without_extension = file_name.split('.')[0]
-        video_uuid = file_name_without_extension
-
-        data = {"item_id": item_id, "video_uuid": video_uuid}
-        response = requests.post(server_url, json=data)
-        response.raise_for_status()
-        return video_uuid
-    except requests.RequestException as e:
+        await gpu_client.send_video(item_id, video_uuid)
+    except (httpx.HTTPError, CircuitOpenError) as e:
         print(f"An error occurred while sending image URL to another server: {e}")
-        raise HTTPException(status_code=500, detail="Failed to send image URL to GPU server")
+        raise
+    progress_hub.report(item_id, {"video_uuid": video_uuid, "status": "dispatched"})
+    return video_uuid
     
     
 
-# S3 파일 업로드
-def upload_file_to_s3(file: UploadFile) -> str:
+# S3 파일 업로드 (UploadFile 스풀에서 파트 단위로 스트리밍)
+def upload_file_to_s3(file: UploadFile, client=None) -> str:
     try:
         unique_filename = str(uuid.uuid4())
         file_extension = file.filename.split(".")[-1]
         s3_key = f"{unique_filename}.{file_extension}"
-        file_body = file.file.read()
-        response = s3_client.put_object(Bucket=bucket_name, Key=s3_key, Body=file_body)
+        file.file.seek(0)
+        s3_upload.upload_stream(
+            client or s3_client, bucket_name, s3_key, file.file, content_type=file.content_type
+        )
 
-        s3_url = f"https://{bucket_name}.s3.amazonaws.com/{s3_key}"
-        return s3_url   
+        return s3_object_url(s3_key)
 
     except Exception as e:
         print(f"An error occurred while uploading file to S3: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to upload file to S3")
 
+# 이벤트 루프를 막지 않도록 S3 업로드를 스레드풀에서 실행
+async def upload_file_to_s3_async(file: UploadFile, client=None) -> str:
+    return await run_in_threadpool(upload_file_to_s3, file, client)
+
+# 직접 업로드 1단계: 파일마다 S3 키와 presigned URL 을 발급하고, 키를 담은 서명된 업로드 티켓을 돌려줌
+def prepare_item_upload(files, client=None) -> dict:
+    client = client or s3_client
+    uploads = {}
+    claims_files = {}
+    for file in files:
+        file_extension = file.filename.split(".")[-1]
+        s3_key = f"{uuid.uuid4()}.{file_extension}"
+        try:
+            upload = s3_upload.presign_upload(client, bucket_name, s3_key, file.size, content_type=file.content_type)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        uploads[file.field] = upload
+        claims_files[file.field] = {"key": s3_key, "size": file.size, "upload_id": upload.get("upload_id")}
+    ticket = auth.issue_claims({"typ": UPLOAD_TICKET, "files": claims_files}, s3_upload.PRESIGN_EXPIRES)
+    return {"ticket": ticket, "uploads": uploads}
+
+# 직접 업로드 2단계: 파일이 S3 에 올라갔는지 확인하고 제품 등록 + GPU 전송 작업 등록
+def finalize_item_upload(db: Session, body: schemas.ItemFinalizeSchema, client=None):
+    client = client or s3_client
+    claims = auth.decode(body.ticket, UPLOAD_TICKET)
+    urls = {}
+    for field, file in claims["files"].items():
+        if file["upload_id"]:
+            parts = [{"PartNumber": part.part_number, "ETag": part.etag} for part in body.parts.get(field, [])]
+            if not parts:
+                raise HTTPException(status_code=400, detail=f"Missing uploaded parts for {field}")
+            try:
+                s3_upload.complete_upload(client, bucket_name, file["key"], file["upload_id"], parts)
+            except Exception as e:
+                print(f"An error occurred while completing multipart upload: {e}")
+                raise HTTPException(status_code=400, detail=f"Failed to complete upload for {field}")
+        size = s3_upload.object_size(client, bucket_name, file["key"])
+        if size is None:
+            raise HTTPException(status_code=400, detail=f"{field} has not been uploaded")
+        if size != file["size"]:
+            raise HTTPException(status_code=400, detail=f"{field} size does not match the requested size")
+        urls[field] = s3_object_url(file["key"])
+
+    item = schemas.ItemSchema(
+        name=body.name, description=body.description, price=body.price, category_id=body.category_id, stock=body.stock
+    )
+    # 티켓 사용 기록을 제품과 같은 트랜잭션에 넣어서, 동시에 완료하면 늦게 커밋하는 쪽이 실패함
+    db.add(models.UploadTicket(jti=claims["jti"]))
+    try:
+        db_item = create_item(db, item, urls.get("image"), urls.get("video"))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Upload ticket already used")
+    # 이후 요청은 S3 를 확인하기 전에 거절되도록 폐기 목록에도 등록
+    auth.revoke(claims)
+    send_video(db, db_item.id)
+    enqueue_image_variants(db, db_item.id)
+    db.refresh(db_item)
+    return db_item
+
+# S3 URL 에서 객체 키 (버킷 바로 아래에 올리므로 마지막 경로)
+def s3_key_from_url(url: str) -> str:
+    return urlparse(url).path.split('/')[-1]
+
+# 제품 이미지의 썸네일/중간 크기 WebP 생성 작업 등록 (원본 이미지 기준으로 한 번만 등록됨)
+def enqueue_image_variants(db: Session, item_id: int):
+    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+    if not db_item or not db_item.image:
+        return None
+    return job_queue.enqueue(
+        db, "image_variants", f"image_variants:{s3_key_from_url(db_item.image)}",
+        {"item_id": item_id, "image": db_item.image}, item_id=item_id
+    )
+
+# 이미지 변형 생성 (작업 큐 워커에서 실행)
+# 변형 파일 키가 원본 키로 정해지므로 중간에 실패해도 다시 실행하면 이어서 처리되고, 이미 다 있으면 변환을 건너뜀
+@job_queue.handler("image_variants")
+async def generate_image_variants(payload: dict):
+    item_id, image_url = payload["item_id"], payload["image"]
+    s3_key = s3_key_from_url(image_url)
+    keys = {name: image_variants.variant_key(s3_key, name) for name in image_variants.VARIANTS}
+
+    sizes = await run_in_threadpool(lambda: [s3_upload.object_size(s3_client, bucket_name, key) for key in keys.values()])
+    if None in sizes:
+        original = await run_in_threadpool(lambda: s3_client.get_object(Bucket=bucket_name, Key=s3_key)["Body"].read())
+        rendered = await image_variants.render_async(original)
+        for name, data in rendered.items():
+            await run_in_threadpool(
+                s3_client.put_object, Bucket=bucket_name, Key=keys[name], Body=data,
+                ContentType=image_variants.CONTENT_TYPE, CacheControl=image_variants.CACHE_CONTROL
+            )
+
+    urls = {name: s3_object_url(key) for name, key in keys.items()}
+    await run_in_threadpool(set_image_variants, item_id, image_url, urls)
+    return urls
+
+def set_image_variants(item_id: int, image_url: str, urls: dict):
+    db = SessionLocal()
+    try:
+        # 작업이 도는 동안 이미지가 바뀌었으면 예전 이미지의 변형으로 덮어쓰지 않음
+        updated = db.query(models.Item).filter(models.Item.id == item_id, models.Item.image == image_url).update(
+            {models.Item.image_thumb: urls.get("thumb"), models.Item.image_medium: urls.get("medium")},
+            synchronize_session=False
+        )
+        db.commit()
+        if updated:
+            item_changed(item_id, db.query(models.Item.category_id).filter(models.Item.id == item_id).scalar())
+    finally:
+        db.close()
+
+# 변형이 없는 기존 제품의 이미지 변형 작업 등록
+def backfill_image_variants(db: Session) -> int:
+    count = 0
+    last_id = 0
+    while True:
+        item_ids = [
+            row.id for row in db.query(models.Item.id)
+            .filter(models.Item.id > last_id, models.Item.image.isnot(None), models.Item.image_thumb.is_(None))
+            .order_by(models.Item.id)
+            .limit(1000)
+        ]
+        if not item_ids:
+            return count
+        for item_id in item_ids:
+            enqueue_image_variants(db, item_id)
+        count += len(item_ids)
+        last_id = item_ids[-1]
+
+# .ply 를 .splat 으로 변환하는 작업 등록 (원본 파일 기준으로 한 번만 등록됨)
+def enqueue_splat_conversion(db: Session, item_id: int):
+    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+    if not SPLAT_CONVERT or not db_item or not db_item.splat or not db_item.splat.endswith(".ply"):
+        return None
+    return job_queue.enqueue(
+        db, "splat_convert", f"splat_convert:{s3_key_from_url(db_item.splat)}",
+        {"item_id": item_id, "splat": db_item.splat}, item_id=item_id
+    )
+
+# .ply 를 임시 파일로 내려받아 변환하고 같은 이름의 .splat 으로 올림 (작업 큐 워커에서 실행)
+@job_queue.handler("splat_convert")
+async def convert_splat(payload: dict):
+    item_id, splat_url = payload["item_id"], payload["splat"]
+    ply_key = s3_key_from_url(splat_url)
+    splat_key = ply_key.rsplit(".", 1)[0] + ".splat"
+    if await run_in_threadpool(s3_upload.object_size, s3_client, bucket_name, splat_key) is None:
+        await run_in_threadpool(build_splat_file, ply_key, splat_key)
+    url = s3_object_url(splat_key)
+    await run_in_threadpool(set_splat_compressed, item_id, splat_url, url)
+    return url
+
+def build_splat_file(ply_key: str, splat_key: str):
+    with tempfile.TemporaryDirectory() as tmp:
+        ply_path = os.path.join(tmp, "source.ply")
+        splat_path = os.path.join(tmp, "output.splat")
+        body = s3_client.get_object(Bucket=bucket_name, Key=ply_key)["Body"]
+        with open(ply_path, "wb") as f:
+            for chunk in iter(lambda: body.read(media_store.CHUNK_SIZE), b""):
+                f.write(chunk)
+        splat_convert.convert_file(ply_path, splat_path)
+        with open(splat_path, "rb") as f:
+            s3_upload.upload_stream(s3_client, bucket_name, splat_key, f, content_type="application/octet-stream")
+
+def set_splat_compressed(item_id: int, splat_url: str, url: str):
+    db = SessionLocal()
+    try:
+        updated = db.query(models.Item).filter(models.Item.id == item_id, models.Item.splat == splat_url).update(
+            {models.Item.splat_compressed: url}, synchronize_session=False
+        )
+        db.commit()
+        if updated:
+            item_changed(item_id, db.query(models.Item.category_id).filter(models.Item.id == item_id).scalar())
+    finally:
+        db.close()
+
+# image_size 파라미터에 해당하는 제품 컬럼 이름 (원본이면 None)
+def image_size_column(image_size: str = None):
+    if image_size is None or image_size == "original":
+        return None
+    if image_size not in image_variants.IMAGE_SIZES:
+        raise HTTPException(status_code=400, detail=f"Unsupported image size: {image_size}")
+    return f"image_{image_size}"
+
+# 목록 응답의 image 를 요청한 크기의 변형으로 바꿈 (변형이 아직 없으면 원본)
+def with_image_size(items, image_size: str = None):
+    column = image_size_column(image_size)
+    if column is None:
+        return items
+    results = []
+    for item in items:
+        data = dict(item) if isinstance(item, dict) else item_to_dict(item)
+        data["image"] = data.get(column) or data["image"]
+        results.append(data)
+    return results
+
 def upload_splat_to_s3(db: Session, item_id: int, splat_file: UploadFile):
     db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
     
@@ -187,6 +767,7 @@ def upload_splat_to_s3(db: Session, item_id: int, splat_file: UploadFile):
 
     db_item.splat = splat_path
     db.commit()
+    item_changed(db_item.id, db_item.category_id)
     return db_item
 
 
@@ -206,8 +787,8 @@ def receive_splat(db: Session, item_id: int, splat_uuid: str):
         print(db_item.splat)
         db.commit()
         db.refresh(db_item)
+        item_changed(db_item.id, db_item.category_id)
+        # 작업을 닫고 해당 아이템을 구독 중인 클라이언트에게 완료 알림
+        progress_hub.complete(item_id, db_item.splat)
+        enqueue_splat_conversion(db, item_id)
         return db_item
-
-def delete_items_in_other_category(db: Session):
-    db.query(models.Item).filter(models.Item.category.has(models.Category.name == "기타")).delete(synchronize_session=False)
-    db.commit()
@@ -0,0 +1,97 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+import models, pagination
+from cache import cache
+from database import AsyncSessionLocal
+from crud import ITEM_SORTS, REVIEW_SORTS, USER_SORTS, item_list_query, item_to_dict, review_to_dict, item_detail_to_dict, review_visible
+
+# crud.py 조회 함수의 비동기 버전 (AsyncSession 사용, 캐시 키는 동기 버전과 같음)
+
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(models.User).filter(models.User.id == user_id))).first()
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    return (await db.scalars(select(models.User).filter(models.User.email == email))).first()
+
+# 로그인할 때 평문/예전 설정의 비밀번호를 새 해시로 바꿈
+async def update_password_hash(db: AsyncSession, user_id: int, password_hash: str):
+    await db.execute(update(models.User).filter(models.User.id == user_id).values(password=password_hash))
+    await db.commit()
+
+async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = pagination.apply(select(models.User), models.User, "id", USER_SORTS, cursor=cursor, skip=skip, limit=limit)
+    return (await db.scalars(query)).all()
+
+# 모든 제품 목록 불러오기
+async def get_items(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id", min_stars: float = None):
+    query = item_list_query(sort, min_stars)
+    return (await db.scalars(pagination.apply(query, models.Item, sort, ITEM_SORTS, cursor=cursor, skip=skip, limit=limit))).all()
+
+# 컬럼만 고른 조회 결과 (crud.item_rows_query 등으로 만든 쿼리)
+async def get_rows(db: AsyncSession, query):
+    return (await db.execute(query)).all()
+
+# 큰 목록을 묶음 단위 dict 목록으로 흘려보냄
+# 응답을 보내는 동안 쓰므로 요청 의존성의 세션이 아닌 별도 세션을 사용 (bulk.export_rows 와 같은 방식)
+async def stream_rows(query, to_dict, batch_size: int = 500):
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for rows in result.partitions(batch_size):
+            yield [to_dict(row) for row in rows]
+
+async def get_item(db: AsyncSession, item_id: int):
+    return (await db.scalars(select(models.Item).filter(models.Item.id == item_id, models.Item.deleted_at.is_(None)))).first()
+
+async def get_item_cached(db: AsyncSession, item_id: int):
+    async def load():
+        return item_to_dict(await get_item(db, item_id))
+    return await cache.aget_or_load("item", item_id, load)
+
+# 카테고리 별 제품 목록
+async def get_items_by_category(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id"):
+    query = item_list_query(sort).filter(models.Item.category_id == category_id)
+    return (await db.scalars(pagination.apply(query, models.Item, sort, ITEM_SORTS, cursor=cursor, skip=skip, limit=limit))).all()
+
+async def get_items_by_category_cached(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 100, cursor: str = None, sort: str = "id"):
+    async def load():
+        return [item_to_dict(item) for item in await get_items_by_category(db, category_id, skip, limit, cursor, sort)]
+    return await cache.aget_or_load(f"category:{category_id}", f"{sort}:{skip}:{limit}:{cursor}", load, generational=True)
+
+# 리뷰 조회
+async def get_reviews(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str = None):
+    query = pagination.apply(select(models.Review).filter(review_visible()), models.Review, "id", REVIEW_SORTS, cursor=cursor, skip=skip, limit=limit)
+    return (await db.scalars(query)).all()
+
+# 제품별 리뷰 불러오기
+async def get_item_reviews(db: AsyncSession, item_id: int):
+    return (await db.scalars(select(models.Review).filter(models.Review.item_id == item_id, review_visible()))).all()
+
+async def get_item_reviews_cached(db: AsyncSession, item_id: int):
+    async def load():
+        return [review_to_dict(review) for review in await get_item_reviews(db, item_id)]
+    return await cache.aget_or_load("reviews:item", item_id, load)
+
+# 제품 상세 페이지용 묶음 조회
+async def get_item_detail(db: AsyncSession, item_id: int, review_limit: int = 10, review_cursor: str = None):
+    query = select(models.Item).options(joinedload(models.Item.category)).filter(models.Item.id == item_id, models.Item.deleted_at.is_(None))
+    db_item = (await db.scalars(query)).first()
+    if db_item is None:
+        return None
+
+    query = select(models.Review).filter(models.Review.item_id == item_id)
+    query = pagination.apply(query, models.Review, "-id", REVIEW_SORTS, cursor=review_cursor, limit=review_limit)
+    reviews = (await db.scalars(query)).all()
+    return item_detail_to_dict(db_item, reviews, review_limit)
+
+async def get_item_detail_cached(db: AsyncSession, item_id: int, review_limit: int = 10, review_cursor: str = None):
+    async def load():
+        return await get_item_detail(db, item_id, review_limit, review_cursor)
+    return await cache.aget_or_load(f"detail:{item_id}", f"{review_limit}:{review_cursor}", load, generational=True)
+
+async def get_orders_by_user(db: AsyncSession, user_id: int):
+    return (await db.scalars(select(models.Order).filter(models.Order.user_id == user_id))).all()
+
+async def get_orders_by_item(db: AsyncSession, item_id: int):
+    return (await db.scalars(select(models.Order).filter(models.Order.item_id == item_id))).all()
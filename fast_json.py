@@ -0,0 +1,72 @@
+import json
+
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+
+# fastapi[all] 에 포함된 orjson 을 쓰고, 없으면 표준 json 으로 같은 바이트를 만듦
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FORMATS = ("json", "json-stream", "ndjson")
+# 묶음씩 흘려보내는 형식 (json-stream 은 JSON 배열, ndjson 은 한 줄에 한 행)
+STREAM_FORMATS = ("json-stream", "ndjson")
+MEDIA_TYPES = {
+    "json": "application/json",
+    "json-stream": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+# 한 번에 만들어서 보내는 JSON 페이지의 최대 행 수 (더 많이 받으려면 커서로 넘기거나 스트리밍 형식 사용)
+MAX_PAGE_SIZE = 1000
+# 스트리밍할 때 DB 에서 한 번에 가져오는 행 수
+STREAM_BATCH_SIZE = 500
+
+
+def dumps(value) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def check_format(format: str) -> str:
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    return format
+
+
+# 스트리밍은 스트리밍 형식을 명시했을 때만 (JSON 페이지는 항상 다음 페이지 커서를 돌려줌)
+def should_stream(format: str) -> bool:
+    return check_format(format) in STREAM_FORMATS
+
+
+# 스트리밍하지 않는 페이지는 메모리에 한 번에 만들어지므로 크기를 제한
+def check_limit(format: str, limit: int) -> int:
+    if not should_stream(format) and limit > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be at most {MAX_PAGE_SIZE} (use format=json-stream or ndjson for more)")
+    return limit
+
+
+# 응답 모델 검증 없이 dict 목록을 바로 인코딩 (헤더는 핸들러의 Response 에 설정한 ETag/커서를 그대로 사용)
+def response(content, headers_from: Response) -> Response:
+    return Response(dumps(content), media_type=MEDIA_TYPES["json"], headers=dict(headers_from.headers))
+
+
+# dict 목록을 묶음 단위로 돌려주는 비동기 iterator 를 JSON 배열 또는 NDJSON 으로 인코딩
+async def encode_batches(batches, format: str):
+    if format == "ndjson":
+        async for batch in batches:
+            yield b"".join(dumps(row) + b"\n" for row in batch)
+        return
+    yield b"["
+    separator = b""
+    async for batch in batches:
+        if batch:
+            yield separator + b",".join(dumps(row) for row in batch)
+            separator = b","
+    yield b"]"
+
+
+# 스트리밍 응답은 끝까지 읽기 전에는 마지막 행을 모르므로 다음 페이지 커서 헤더를 붙이지 않음
+def stream(batches, format: str, headers_from: Response) -> StreamingResponse:
+    return StreamingResponse(encode_batches(batches, format), media_type=MEDIA_TYPES[format], headers=dict(headers_from.headers))
@@ -0,0 +1,154 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+import metrics
+
+GPU_SERVER_URL = "http://163.180.117.43:9003"
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+# 연속 실패가 쌓이면 일정 시간 GPU 서버 호출을 막는 서킷 브레이커
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        # half-open 상태에서는 시험 요청 하나만 통과
+        if state == "half-open" and not self._probing:
+            self._probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        self._probing = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    # 시험 요청이 성공/실패 없이 끝난 경우 (취소 등) 다음 요청이 다시 시험할 수 있도록
+    def release_probe(self):
+        self._probing = False
+
+
+# GPU 서버 공용 비동기 클라이언트 (keep-alive 커넥션 풀, 타임아웃, 재시도, 서킷 브레이커)
+class GPUClient:
+    def __init__(
+        self,
+        base_url: str,
+        timeout: httpx.Timeout = httpx.Timeout(10.0, connect=3.0),
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        retries: int = 3,
+        backoff: float = 0.5,
+        breaker: CircuitBreaker = None,
+        transport: httpx.AsyncBaseTransport = None,
+    ):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.transport = transport
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url, timeout=self.timeout, limits=self.limits, transport=self.transport
+            )
+        return self._client
+
+    # 전송 오류와 5xx 만 서버 장애로 봄 (4xx 는 서버가 정상적으로 요청을 거절한 것)
+    def _is_failure(self, error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code >= 500
+        return True
+
+    def _should_retry(self, error: Exception, idempotent: bool) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return idempotent and error.response.status_code >= 500
+        # 멱등하지 않은 요청은 서버에 도달하지 못한 경우에만 재시도
+        if not idempotent:
+            return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+        return isinstance(error, httpx.TransportError)
+
+    async def request(self, method: str, path: str, idempotent: bool = None, **kwargs) -> httpx.Response:
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD", "PUT", "DELETE")
+        if not self.breaker.allow():
+            metrics.gpu_duration.observe(method, path, "circuit_open", value=0.0)
+            raise CircuitOpenError(f"GPU server circuit is open ({self.base_url})")
+        # 닫힌 상태가 아니면서 통과했으면 이 요청이 half-open 시험 요청
+        probe = self.breaker.state != "closed"
+
+        attempt = 0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    response = await self.client.request(method, path, **kwargs)
+                    response.raise_for_status()
+                    self.breaker.record_success()
+                    metrics.gpu_duration.observe(method, path, "ok", value=time.perf_counter() - started)
+                    return response
+                except httpx.HTTPError as e:
+                    metrics.gpu_duration.observe(method, path, "error", value=time.perf_counter() - started)
+                    if attempt >= self.retries or not self._should_retry(e, idempotent):
+                        if self._is_failure(e):
+                            self.breaker.record_failure()
+                        else:
+                            self.breaker.record_success()
+                        raise
+                    # 지수 백오프 + 지터
+                    await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+                    attempt += 1
+        finally:
+            if probe:
+                self.breaker.release_probe()
+
+    async def get_progress(self) -> str:
+        response = await self.request("GET", "/api/proginfo")
+        return response.text
+
+    async def send_video(self, item_id: int, video_uuid: str) -> httpx.Response:
+        return await self.request(
+            "POST", "/api/downloadvideo", json={"item_id": item_id, "video_uuid": video_uuid}
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+gpu_client = GPUClient(GPU_SERVER_URL)
@@ -0,0 +1,91 @@
+import hashlib
+import time
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from cache import cache
+
+# CDN 은 짧게 캐시하고, 브라우저/앱은 매번 재검증 (변경이 없으면 304 로 끝남)
+CACHE_CONTROL = "public, max-age=0, s-maxage=30, stale-while-revalidate=30"
+# 수정 시각/에포크 보관 기간 (지워지면 새로 만들어서 ETag 가 바뀌고 한 번 200 으로 응답할 뿐)
+VERSION_TTL = 30 * 24 * 3600
+
+
+# 테이블/아이템 단위 버전 카운터 (crud 쓰기 함수에서 올림)
+# 캐시 세대처럼 캐시 저장소에 두어서, Redis 를 쓰면 여러 프로세스가 같은 ETag/Last-Modified 를 만듦
+class Versions:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def bump(self, *keys: str):
+        now = time.time()
+        for key in keys:
+            self.backend.incr(f"version:{key}")
+            self.backend.set(f"modified:{key}", now, VERSION_TTL)
+
+    # 카운터가 0부터 다시 시작할 수 있으므로 (프로세스 재시작, 캐시 비우기) 에포크를 ETag 에 넣어 충돌을 막음
+    def epoch(self) -> str:
+        value = self.backend.get("versions:epoch")
+        if value is None:
+            value = uuid.uuid4().hex[:8]
+            self.backend.set("versions:epoch", value, VERSION_TTL)
+        return value
+
+    def get(self, key: str):
+        modified = self.backend.get(f"modified:{key}")
+        if modified is None:
+            # 기록이 없으면 지금을 수정 시각으로 저장 (과거 시각을 쓰면 잘못된 304 가 나갈 수 있음)
+            modified = time.time()
+            self.backend.set(f"modified:{key}", modified, VERSION_TTL)
+        return self.backend.counter(f"version:{key}"), modified
+
+
+versions = Versions(cache.backend)
+
+
+def make_etag(keys, params: str = "") -> str:
+    parts = [str(versions.get(key)[0]) for key in keys]
+    digest = hashlib.md5(params.encode()).hexdigest()[:8]
+    return f'W/"{versions.epoch()}-{".".join(parts)}-{digest}"'
+
+
+def last_modified(keys) -> float:
+    return max(versions.get(key)[1] for key in keys)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # 약한 비교: W/ 접두어를 무시하고 비교
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, modified: float) -> bool:
+    try:
+        return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+# 조건부 요청 처리: 변경이 없으면 304 응답을 돌려주고, 아니면 응답에 캐시 헤더를 붙이고 None 반환
+# 본문을 만들기 전에 호출하므로 304 인 경우 DB 조회와 직렬화를 모두 건너뜀
+def conditional(request: Request, response: Response, keys) -> Response:
+    etag = make_etag(keys, request.url.query)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified(keys), usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = if_modified_since is not None and _not_modified_since(if_modified_since, last_modified(keys))
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
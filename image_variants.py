@@ -0,0 +1,69 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# 변형 이름과 긴 변의 최대 픽셀 (원본보다 크게 늘리지는 않음)
+VARIANTS = {
+    "thumb": 256,
+    "medium": 1024,
+}
+# 목록 API 의 image_size 파라미터로 고를 수 있는 크기
+IMAGE_SIZES = ("thumb", "medium", "original")
+
+WEBP_QUALITY = int(os.environ.get("IMAGE_WEBP_QUALITY", "80"))
+# 이미지 변환은 CPU 를 많이 쓰므로 별도 프로세스에서 실행
+WORKERS = int(os.environ.get("IMAGE_WORKERS", str(os.cpu_count() or 1)))
+
+CONTENT_TYPE = "image/webp"
+# 변형 파일 키는 원본 키에서 정해지고 내용이 바뀌지 않으므로 오래 캐시해도 됨
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+# 원본 S3 키에서 변형 파일 키 만들기 (같은 원본이면 항상 같은 키라서 다시 실행해도 덮어쓰기만 함)
+def variant_key(s3_key: str, variant: str) -> str:
+    stem = s3_key.rsplit(".", 1)[0]
+    return f"{stem}_{variant}.webp"
+
+
+# 원본 이미지 바이트를 변형별 WebP 바이트로 변환 (프로세스 풀에서 실행)
+def render(data: bytes, variants: dict = None, quality: int = WEBP_QUALITY) -> dict:
+    from PIL import Image, ImageOps
+
+    variants = variants or VARIANTS
+    results = {}
+    with Image.open(io.BytesIO(data)) as source:
+        # 휴대폰 사진의 EXIF 회전 정보를 실제 픽셀에 반영
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.mode in ("LA", "P", "PA") else "RGB")
+        for name, max_side in variants.items():
+            resized = image.copy()
+            resized.thumbnail((max_side, max_side), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, "WEBP", quality=quality, method=4)
+            results[name] = buffer.getvalue()
+    return results
+
+
+_pool = None
+
+
+def pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # 작업 큐/웹소켓 스레드가 도는 프로세스를 fork 하지 않도록 spawn 사용
+        _pool = ProcessPoolExecutor(max_workers=WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def render_async(data: bytes) -> dict:
+    return await asyncio.get_running_loop().run_in_executor(pool(), render, data)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
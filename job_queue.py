@@ -0,0 +1,263 @@
+import asyncio
+import json
+import os
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+import models
+from database import SessionLocal
+
+# 작업 종류별 실행 함수
+handlers = {}
+
+# 작업 종류별 동시 실행 한도 (GPU 서버 한 대에 요청이 몰리지 않도록 제한)
+CONCURRENCY_LIMITS = {"send_video": 2}
+WORKERS = 4
+POLL_INTERVAL = 1.0
+# 재시도 대기 시간: RETRY_BACKOFF * 2^(시도 횟수 - 1) 초
+RETRY_BACKOFF = 5.0
+# 실행 중인 작업은 이 시간 안에 갱신되지 않으면 실행하던 프로세스가 죽은 것으로 보고 다시 대기열로 보냄
+# (실행 중인 프로세스는 LEASE_TIMEOUT / 3 마다 updated_at 을 갱신)
+LEASE_TIMEOUT = float(os.environ.get("JOB_LEASE_TIMEOUT", "300"))
+
+
+def handler(kind: str):
+    def decorator(func):
+        handlers[kind] = func
+        return func
+    return decorator
+
+
+# 작업 등록 (같은 key 의 작업이 이미 있으면 새로 만들지 않고 기존 작업을 반환)
+def enqueue(db: Session, kind: str, key: str, payload: dict = None, item_id: int = None, max_attempts: int = 5):
+    db_job = db.query(models.Job).filter(models.Job.key == key).first()
+    if db_job:
+        return db_job
+    db_job = models.Job(
+        kind=kind, key=key, item_id=item_id, payload=json.dumps(payload or {}), max_attempts=max_attempts
+    )
+    db.add(db_job)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return db.query(models.Job).filter(models.Job.key == key).first()
+    db.refresh(db_job)
+    queue.notify()
+    return db_job
+
+
+def get_job(db: Session, job_id: int):
+    return db.query(models.Job).filter(models.Job.id == job_id).first()
+
+
+def get_jobs(db: Session, status: str = None, item_id: int = None, skip: int = 0, limit: int = 100):
+    query = db.query(models.Job)
+    if status:
+        query = query.filter(models.Job.status == status)
+    if item_id is not None:
+        query = query.filter(models.Job.item_id == item_id)
+    return query.order_by(models.Job.id.desc()).offset(skip).limit(limit).all()
+
+
+# 실패한 작업을 다시 대기열에 넣기
+def retry_job(db: Session, job_id: int):
+    db_job = get_job(db, job_id)
+    if db_job and db_job.status == "failed":
+        db_job.status = "queued"
+        db_job.attempts = 0
+        db_job.run_after = datetime.utcnow()
+        db.commit()
+        db.refresh(db_job)
+        queue.notify()
+    return db_job
+
+
+# SQLite 에 저장되는 작업 큐 + 워커 풀
+class JobQueue:
+    def __init__(self, session_factory=SessionLocal, workers: int = WORKERS, concurrency_limits: dict = None,
+                 poll_interval: float = POLL_INTERVAL):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.concurrency_limits = CONCURRENCY_LIMITS if concurrency_limits is None else concurrency_limits
+        self.poll_interval = poll_interval
+        self.lease_timeout = LEASE_TIMEOUT
+        # 이 프로세스에서 실행 중인 작업 (id -> 종류)
+        self.running = {}
+        self.claim_lock = None
+        self.tasks = []
+        self.loop = None
+        self.wakeup = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        self.claim_lock = asyncio.Lock()
+        # 죽은 프로세스가 실행하던 작업은 다시 대기열로 (다른 프로세스가 실행 중인 작업은 그대로 둠)
+        await run_in_threadpool(self._requeue_expired)
+        self.tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self.tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    # 새 작업이 등록되면 쉬고 있는 워커를 깨움 (다른 스레드에서 불려도 안전)
+    def notify(self):
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.wakeup.set()
+        else:
+            self.loop.call_soon_threadsafe(self.wakeup.set)
+
+    def _requeue_expired(self):
+        db = self.session_factory()
+        try:
+            expired = datetime.utcnow() - timedelta(seconds=self.lease_timeout)
+            db.query(models.Job).filter(models.Job.status == "running", models.Job.updated_at < expired).update(
+                {"status": "queued"}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    # 이 프로세스가 실행 중인 작업의 임대 시간 연장
+    def _touch(self, job_ids):
+        db = self.session_factory()
+        try:
+            db.query(models.Job).filter(models.Job.id.in_(job_ids), models.Job.status == "running").update(
+                {"updated_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            try:
+                if self.running:
+                    await run_in_threadpool(self._touch, list(self.running))
+                await run_in_threadpool(self._requeue_expired)
+            except Exception as e:
+                print(f"Failed to renew job leases: {e}")
+
+    # 대기 중인 작업 하나를 원자적으로 가져와 running 으로 표시 (동시 실행 한도에 찬 종류는 건너뜀)
+    def _claim(self, excluded_kinds=()):
+        db = self.session_factory()
+        try:
+            query = db.query(models.Job.id).filter(models.Job.status == "queued", models.Job.run_after <= datetime.utcnow())
+            if excluded_kinds:
+                query = query.filter(models.Job.kind.notin_(excluded_kinds))
+            candidates = query.order_by(models.Job.id).limit(self.workers).all()
+            for (job_id,) in candidates:
+                claimed = (
+                    db.query(models.Job)
+                    .filter(models.Job.id == job_id, models.Job.status == "queued")
+                    .update(
+                        {"status": "running", "attempts": models.Job.attempts + 1, "updated_at": datetime.utcnow()},
+                        synchronize_session=False,
+                    )
+                )
+                db.commit()
+                if claimed:
+                    db_job = get_job(db, job_id)
+                    return {
+                        "id": db_job.id,
+                        "kind": db_job.kind,
+                        "item_id": db_job.item_id,
+                        "payload": json.loads(db_job.payload or "{}"),
+                        "attempts": db_job.attempts,
+                        "max_attempts": db_job.max_attempts,
+                    }
+            return None
+        finally:
+            db.close()
+
+    def _finish(self, job: dict, error: str = None):
+        db = self.session_factory()
+        try:
+            db_job = get_job(db, job["id"])
+            if error is None:
+                db_job.status = "done"
+                db_job.last_error = None
+            elif job["attempts"] >= job["max_attempts"]:
+                db_job.status = "failed"
+                db_job.last_error = error
+            else:
+                db_job.status = "queued"
+                db_job.last_error = error
+                db_job.run_after = datetime.utcnow() + timedelta(seconds=RETRY_BACKOFF * 2 ** (job["attempts"] - 1))
+            db.commit()
+        finally:
+            db.close()
+
+    async def _run(self, job: dict):
+        func = handlers.get(job["kind"])
+        if func is None:
+            raise RuntimeError(f"No handler registered for job kind '{job['kind']}'")
+        return await func(job["payload"])
+
+    # 한도에 찬 종류를 빼고 작업을 가져옴 (한도 확인과 가져오기를 워커끼리 겹치지 않게 잠금)
+    async def _claim_next(self):
+        async with self.claim_lock:
+            running = list(self.running.values())
+            full = [kind for kind, limit in self.concurrency_limits.items() if running.count(kind) >= limit]
+            job = await run_in_threadpool(self._claim, full)
+            if job is not None:
+                self.running[job["id"]] = job["kind"]
+            return job
+
+    async def _worker(self):
+        # 결과 저장에 실패한 작업 (DB 잠금 등), 다음 루프에서 다시 저장
+        unfinished = None
+        while True:
+            if unfinished is not None:
+                try:
+                    await run_in_threadpool(self._finish, *unfinished)
+                except Exception as e:
+                    print(f"Failed to finish job {unfinished[0]['id']}: {e}")
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                kind = self.running.pop(unfinished[0]["id"], None)
+                unfinished = None
+                # 한도 때문에 기다리던 같은 종류의 작업을 바로 가져갈 수 있도록 깨움
+                if kind in self.concurrency_limits:
+                    self.wakeup.set()
+
+            try:
+                job = await self._claim_next()
+            except Exception as e:
+                print(f"Failed to claim job: {e}")
+                job = None
+            if job is None:
+                self.wakeup.clear()
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            error = None
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Job {job['id']} ({job['kind']}) failed: {e}")
+                error = "".join(traceback.format_exception_only(type(e), e)).strip()
+            unfinished = (job, error)
+
+
+queue = JobQueue()
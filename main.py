@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, APIRouter, BackgroundTasks
+from fastapi import Depends, FastAPI, HTTPException, APIRouter, BackgroundTasks, Header, Request, Response
 from sqlalchemy.orm import Session
 from fastapi import File, UploadFile
 from fastapi import Form
@@ -9,25 +9,53 @@ from typing import Dict
 import asyncio
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, RedirectResponse, StreamingResponse
 import requests
 
-import crud, models, schemas, websocket
-from database import SessionLocal, engine
+import crud, crud_async, models, schemas, websocket, job_queue, search_index, pagination, http_cache, write_batcher, bulk, passwords, auth, image_variants, media_store, metrics, fast_json, compaction
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import SessionLocal, AsyncSessionLocal, engine, async_engine, add_missing_columns, create_missing_indexes
+from gpu_client import gpu_client
+from starlette.concurrency import run_in_threadpool
+from cache import cache
+from rate_limit import RateLimitMiddleware
 import time
 
 models.Base.metadata.create_all(bind=engine)
+add_missing_columns(models.Base.metadata)
+create_missing_indexes(models.Base.metadata)
+search_index.ensure_index(engine)
 
 app = FastAPI()
 
 UPLOAD_DIR = "./photo"
 
+# 클라이언트별 요청 제한과 과부하 시 요청 거절 (CORS 안쪽에 두어 429/503 응답에도 CORS 헤더가 붙음)
+app.add_middleware(RateLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, "ETag", "Last-Modified", "Retry-After", "Accept-Ranges", "Content-Range", "Content-Length"],
 )
+# 가장 바깥에서 라우트별 지연 시간/상태 코드/요청당 쿼리 수를 기록 (429/503 응답도 포함)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.registry.gauge("websocket_connections", "Open websocket connections", function=lambda: len(websocket.client_connections))
+
+@app.on_event("startup")
+async def start_job_queue():
+    await job_queue.queue.start()
+
+@app.on_event("shutdown")
+async def close_gpu_client():
+    await job_queue.queue.stop()
+    await gpu_client.aclose()
+    await async_engine.dispose()
+    write_batcher.batcher.stop()
+    passwords.pool.shutdown()
+    image_variants.shutdown()
 
 def get_db():
     db = SessionLocal()
@@ -36,40 +64,66 @@ def get_db():
     finally:
         db.close()
 
+# 비동기 DB 세션 (스레드풀을 쓰지 않는 async 핸들러용)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 api_router = APIRouter(prefix="/api")
 
 app.websocket("/ws")(websocket_endpoint)
 
 # 회원가입
-@api_router.post("/join/", response_model=schemas.UserSchema)
+@api_router.post("/join/", response_model=schemas.UserResponseSchema)
 def create_user(user: schemas.UserSchema, db: Session = Depends(get_db)):
     db_user = crud.get_user_by_email(db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="User with this ID already registered")
     return crud.create_user(db=db, user=user)
 
-# 로그인
-@api_router.post("/login")
-def login(user: schemas.UserSchema, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
-    if not db_user or not crud.verify_password(user.password, db_user.password):
+# 로그인 (비밀번호 검증은 전용 스레드 풀에서 실행해서 이벤트 루프를 막지 않음)
+# 이후 요청은 Authorization: Bearer <access_token> 으로 인증
+@api_router.post("/login", response_model=schemas.TokenSchema)
+async def login(user: schemas.UserSchema, db: AsyncSession = Depends(get_async_db)):
+    db_user = await crud_async.get_user_by_email(db, email=user.email)
+    try:
+        valid, new_hash = await passwords.verify_password_async(user.password, db_user.password if db_user else None)
+    except passwords.PoolBusyError:
+        raise HTTPException(status_code=503, detail="Too many login attempts, try again later", headers={"Retry-After": "1"})
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    return True
+    if new_hash:
+        await crud_async.update_password_hash(db, db_user.id, new_hash)
+    return auth.issue_tokens(db_user.id)
+
+# 토큰 갱신 (쓴 리프레시 토큰은 폐기되고 새 리프레시 토큰이 발급됨)
+@api_router.post("/token/refresh", response_model=schemas.TokenSchema)
+def refresh_token(body: schemas.RefreshSchema):
+    return auth.refresh(body.refresh_token)
+
+# 로그아웃 (액세스 토큰과, 보내면 리프레시 토큰까지 폐기)
+@api_router.post("/logout", status_code=204)
+def logout(body: Optional[schemas.RefreshSchema] = None, claims: dict = Depends(auth.current_claims)):
+    auth.revoke(claims)
+    if body is not None:
+        auth.revoke(auth.decode(body.refresh_token, auth.REFRESH))
+    return Response(status_code=204)
 
 # 모든 사용자 보기
-@api_router.get("/users/", response_model=List[schemas.UserSchema])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    users = crud.get_users(db, skip=skip, limit=limit)
+@api_router.get("/users/", response_model=List[schemas.UserResponseSchema])
+async def read_users(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    users = await crud_async.get_users(db, skip=skip, limit=limit, cursor=cursor)
+    pagination.set_next_cursor(response, pagination.next_cursor(users, "id", limit))
     return users
 
 # 상품 등록
 @api_router.post("/items/")
 async def create_item(
-    background_tasks: BackgroundTasks,
     name: str = Form(...),
     description: str = Form(...),
     price: float = Form(...),
     category_id: int = Form(...),
+    stock: Optional[int] = Form(None),
     image: UploadFile = File(None),
     video: UploadFile = File(None),
     db: Session = Depends(get_db),
@@ -79,53 +133,94 @@ async def create_item(
         image_path = None
         video_path = None
 
+        # 이미지와 동영상은 동시에 업로드
+        uploads = []
         if image:
-            image_path = crud.upload_file_to_s3(image)
+            uploads.append(crud.upload_file_to_s3_async(image))
         if video:
-            video_path = crud.upload_file_to_s3(video)
+            uploads.append(crud.upload_file_to_s3_async(video))
+        paths = await asyncio.gather(*uploads)
+
+        if image:
+            image_path = paths[0]
+        if video:
+            video_path = paths[-1]
 
         # 데이터베이스에 아이템 생성 및 이미지 및 동영상 경로 저장
-        db_item = crud.create_item(
+        # GPU 서버 전송과 이미지 변형 생성은 작업 큐에서 처리 (동기 DB 작업이라 이벤트 루프를 막지 않도록 스레드풀에서)
+        db_item = await run_in_threadpool(
+            crud.create_item_with_jobs,
             db,
             schemas.ItemSchema(
                 name=name,
                 description=description,
                 price=price,
                 category_id=category_id,
+                stock=stock,
                 image_path=image_path,
                 video_path=video_path
             ),
             image_path,
             video_path
         )
-        #crud.send_video(db, db_item.id)
-        background_tasks.add_task(crud.send_video, db, db_item.id)
         return {"item": db_item}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# 모든 상품 목록 조회
+# 직접 업로드 1단계: 이미지/동영상을 S3 에 직접 올릴 presigned URL 발급
+@api_router.post("/upload/presign")
+def presign_item_upload(body: schemas.ItemUploadRequestSchema):
+    return crud.prepare_item_upload(body.files)
+
+# 직접 업로드 2단계: 업로드 확인 후 제품 등록 (API 서버는 파일을 전달하지 않음)
+@api_router.post("/upload/finalize")
+def finalize_item_upload(body: schemas.ItemFinalizeSchema, db: Session = Depends(get_db)):
+    return {"item": crud.finalize_item_upload(db, body)}
+
+# 모든 상품 목록 조회 (format=json-stream/ndjson 이면 묶음씩 흘려보내고, 이때는 다음 페이지 커서 헤더 없음)
 @api_router.get("/items/", response_model=List[schemas.ItemResponseModel])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = crud.get_items(db, skip=skip, limit=limit)
-    return items
+async def read_items(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "id", min_stars: Optional[float] = None, image_size: Optional[str] = None, format: str = "json", db: AsyncSession = Depends(get_async_db)):
+    fast_json.check_limit(format, limit)
+    not_modified = http_cache.conditional(request, response, ["items"])
+    if not_modified:
+        return not_modified
+    image_column = crud.image_size_column(image_size)
+    query = crud.item_rows_query(skip=skip, limit=limit, cursor=cursor, sort=sort, min_stars=min_stars)
+    if fast_json.should_stream(format):
+        rows = crud_async.stream_rows(query, lambda row: crud.item_row_to_dict(row, image_column), fast_json.STREAM_BATCH_SIZE)
+        return fast_json.stream(rows, format, response)
+    rows = await crud_async.get_rows(db, query)
+    pagination.set_next_cursor(response, pagination.next_cursor(rows, sort, limit))
+    return fast_json.response([crud.item_row_to_dict(row, image_column) for row in rows], response)
 
 # 카테고리 별 상품 목록 조회
 @api_router.get("/items/category/{category_id}", response_model=List[schemas.ItemResponseModel])
-def get_items_by_category(category_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = crud.get_items_by_category(db, category_id=category_id, skip=skip, limit=limit)
-    return items
+async def get_items_by_category(category_id: int, request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: str = "id", image_size: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    fast_json.check_limit("json", limit)
+    not_modified = http_cache.conditional(request, response, [f"category:{category_id}"])
+    if not_modified:
+        return not_modified
+    items = await crud_async.get_items_by_category_cached(db, category_id=category_id, skip=skip, limit=limit, cursor=cursor, sort=sort)
+    pagination.set_next_cursor(response, pagination.next_cursor(items, sort, limit))
+    # 캐시에는 이미 응답 모양의 dict 가 있으므로 다시 검증하지 않고 인코딩
+    return fast_json.response(crud.with_image_size(items, image_size), response)
 
 # 제품 명 검색
 @api_router.get("/items/search/{item_name}", response_model=List[schemas.ItemResponseModel])
-def search_items_by_name(item_name: str, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    items = crud.search_items_by_name(db, name=item_name, skip=skip, limit=limit)
-    return items
+def search_items_by_name(item_name: str, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, image_size: Optional[str] = None, db: Session = Depends(get_db)):
+    # 관련도 순 결과라서 커서에는 다음 오프셋을 담음
+    offset = pagination.offset_cursor(cursor, skip)
+    items = crud.search_items_by_name(db, name=item_name, skip=offset, limit=limit)
+    pagination.set_next_cursor(response, pagination.next_offset_cursor(items, offset, limit))
+    return crud.with_image_size(items, image_size)
 
 # 상품 상세 보기
 @api_router.get("/items/{item_id}", response_model=schemas.ItemResponseModel)
-def read_item(item_id: int, db: Session = Depends(get_db)):
-    item = crud.get_item(db, item_id=item_id)
+async def read_item(item_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    not_modified = http_cache.conditional(request, response, [f"item:{item_id}"])
+    if not_modified:
+        return not_modified
+    item = await crud_async.get_item_cached(db, item_id=item_id)
     if item is None:
         raise HTTPException(status_code=404, detail="item not found")
     return item
@@ -137,53 +232,66 @@ def create_item_category(category: schemas.CategorySchema, db: Session = Depends
 
 # 전체 리뷰 불러오기
 @api_router.get("/reviews/", response_model=List[schemas.ReviewSchema])
-def read_reviews(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    reviews = crud.get_reviews(db, skip=skip, limit=limit)
-    return reviews
+async def read_reviews(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, format: str = "json", db: AsyncSession = Depends(get_async_db)):
+    fast_json.check_limit(format, limit)
+    not_modified = http_cache.conditional(request, response, ["reviews"])
+    if not_modified:
+        return not_modified
+    query = crud.review_rows_query(skip=skip, limit=limit, cursor=cursor)
+    if fast_json.should_stream(format):
+        return fast_json.stream(crud_async.stream_rows(query, crud.review_row_to_dict, fast_json.STREAM_BATCH_SIZE), format, response)
+    rows = await crud_async.get_rows(db, query)
+    pagination.set_next_cursor(response, pagination.next_cursor(rows, "id", limit))
+    return fast_json.response([crud.review_row_to_dict(row) for row in rows], response)
 
 # 리뷰 생성
 @api_router.post("/items/{item_id}/reviews/", response_model=schemas.ReviewSchema)
-def create_review_for_item(item_id: int, review: schemas.ReviewSchema, db: Session = Depends(get_db)):
+def create_review_for_item(item_id: int, review: schemas.ReviewSchema, user_id: int = Depends(auth.current_user_id), db: Session = Depends(get_db)):
+    review = review.model_copy(update={"user_id": user_id})
     return crud.create_review(db=db, review=review)
 
 # 제품별 리뷰 불러오기
 @api_router.get("/items/{item_id}/reviews/", response_model=List[schemas.ReviewSchema])
-def read_item_reviews(item_id: int, db: Session = Depends(get_db)):
-    reviews = crud.get_item_reviews(db=db, item_id=item_id)
+async def read_item_reviews(item_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    not_modified = http_cache.conditional(request, response, [f"reviews:item:{item_id}"])
+    if not_modified:
+        return not_modified
+    reviews = await crud_async.get_item_reviews_cached(db=db, item_id=item_id)
     return reviews
 
-# 주문하기
+# 주문하기 (가격은 서버에서 계산, 재시도는 Idempotency-Key 헤더로 중복 주문 방지)
 @api_router.post("/order/", response_model=schemas.OrderSchema)
-def create_order(order: schemas.OrderSchema, db: Session = Depends(get_db)):
-    item = crud.get_item_by_id(db, item_id=order.item_id)
-
-    user = crud.get_user_by_id(db, user_id=order.user_id)
+def create_order(order: schemas.OrderSchema, idempotency_key: Optional[str] = Header(None), user_id: int = Depends(auth.current_user_id), db: Session = Depends(get_db)):
+    order = order.model_copy(update={"user_id": user_id})
+    return crud.create_order(db=db, order=order, idempotency_key=idempotency_key)
 
-    item.price = item.price * order.count
+# 장바구니 주문 (여러 제품을 한 번에, 하나라도 재고가 없으면 전체 취소)
+@api_router.post("/orders/cart", response_model=List[schemas.OrderSchema])
+def create_cart_order(cart: schemas.CartSchema, idempotency_key: Optional[str] = Header(None), user_id: int = Depends(auth.current_user_id), db: Session = Depends(get_db)):
+    return crud.place_order(db, user_id, cart.lines, idempotency_key)
 
-    db_order = crud.create_order(db=db, order=order)
-    return db_order
+# 내 주문 내역 조회
+@api_router.get("/orders/me", response_model=List[schemas.OrderSchema])
+async def get_my_orders(user_id: int = Depends(auth.current_user_id), db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.get_orders_by_user(db, user_id=user_id)
 
-# 유저ID로 주문 내역 조회
+# 유저ID로 주문 내역 조회 (본인 주문만)
 @api_router.get("/orders/user/{user_id}", response_model=List[schemas.OrderSchema])
-def get_orders_by_user(user_id: int, db: Session = Depends(get_db)):
-    user = crud.get_user_by_id(db, user_id=user_id)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    orders = crud.get_orders_by_user(db, user_id=user_id)
-    
+async def get_orders_by_user(user_id: int, current_user_id: int = Depends(auth.current_user_id), db: AsyncSession = Depends(get_async_db)):
+    if user_id != current_user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to view other users' orders")
+    orders = await crud_async.get_orders_by_user(db, user_id=user_id)
     return orders
 
 # 상품ID로 주문 내역 조회
 # item.user_id와 조회하는 Id가 다를 경우 접근 불가
 @api_router.get("/orders/items/{item_id}", response_model=List[schemas.OrderSchema])
-def get_orders_by_item(item_id: int, db: Session = Depends(get_db)):
-    item = crud.get_item_by_id(db, item_id=item_id)
+async def get_orders_by_item(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await crud_async.get_item(db, item_id=item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    orders = crud.get_orders_by_item(db, item_id=item_id)
+    orders = await crud_async.get_orders_by_item(db, item_id=item_id)
     return orders
 
 # 결제 완료
@@ -226,26 +334,62 @@ async def create_upload_file(file: UploadFile = File(...)):
 '''
 
 @api_router.get("/items/{item_id}/multi/")
-async def get_item_multi_paths(item_id: int, db: Session = Depends(get_db)):
-    db_item = crud.get_item(db, item_id=item_id)
+async def get_item_multi_paths(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_item = await crud_async.get_item_cached(db, item_id=item_id)
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
 
     return {
-        "image_path": db_item.image,
-        "video_path": db_item.video,
-        "splat_path": db_item.splat
+        "image_path": db_item["image"],
+        "video_path": db_item["video"],
+        "splat_path": db_item["splat"]
     }
 
 @api_router.get("/items/{item_id}/image/")
-async def get_item_multi_paths(item_id: int, db: Session = Depends(get_db)):
-    db_item = crud.get_item(db, item_id=item_id)
+async def get_item_image_path(item_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_item = await crud_async.get_item_cached(db, item_id=item_id)
     
     if not db_item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    return db_item.image
+    return db_item["image"]
+
+# 상품 상세 페이지 묶음 조회 (상품, 카테고리, 미디어 경로, 리뷰 일부, 리뷰 통계)
+@api_router.get("/items/{item_id}/detail", response_model=schemas.ItemDetailResponse)
+async def read_item_detail(item_id: int, request: Request, response: Response, review_limit: int = 10, review_cursor: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    not_modified = http_cache.conditional(request, response, [f"item:{item_id}", f"reviews:item:{item_id}"])
+    if not_modified:
+        return not_modified
+    detail = await crud_async.get_item_detail_cached(db, item_id=item_id, review_limit=review_limit, review_cursor=review_cursor)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return detail
+
+# 제품의 영상 / 3D 파일: 현재 파일의 불변 URL 로 보냄 (파일이 바뀌면 URL 이 바뀌므로 여기만 짧게 캐시)
+@api_router.get("/items/{item_id}/media/{kind}")
+def get_item_media(item_id: int, kind: str, db: Session = Depends(get_db)):
+    item = crud.get_item_cached(db, item_id) if kind in crud.MEDIA_KINDS else None
+    if not item or not item.get(kind):
+        raise HTTPException(status_code=404, detail="Media not found")
+    return RedirectResponse(
+        f"{api_router.prefix}/media/{crud.s3_key_from_url(item[kind])}",
+        status_code=307,
+        headers={"Cache-Control": "public, max-age=60"},
+    )
+
+# 미디어 스트리밍 (Range 요청 지원, 저장소에서 조각씩 읽어서 보냄)
+@api_router.api_route("/media/{key}", methods=["GET", "HEAD"])
+def stream_media(key: str, request: Request):
+    try:
+        status_code, headers, byte_range = media_store.prepare(crud.media_backend, key, request.headers)
+    except media_store.MediaNotFound:
+        raise HTTPException(status_code=404, detail="Media not found")
+    except media_store.RangeNotSatisfiable as e:
+        return Response(status_code=416, headers=e.args[0])
+    if byte_range is None or request.method == "HEAD" or byte_range[1] < byte_range[0]:
+        return Response(status_code=status_code, headers=headers)
+    return StreamingResponse(crud.media_backend.read(key, *byte_range), status_code=status_code, headers=headers)
 
 # GPU 서버에서 이미지 받아오기
 @api_router.put("/receive")
@@ -255,11 +399,88 @@ def receive_splat(item_id: int, splat_uuid: str, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# GPU 워커가 작업 진행 상황을 푸시
+@api_router.post("/progress")
+def report_progress(event: schemas.ProgressEventSchema, db: Session = Depends(get_db)):
+    item_id = event.item_id
+    if item_id is None and event.video_uuid:
+        item_id = websocket.progress_hub.find_item_id(event.video_uuid)
+        if item_id is None:
+            db_item = crud.get_item_by_video_uuid(db, video_uuid=event.video_uuid)
+            item_id = db_item.id if db_item else None
+    if item_id is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return websocket.progress_hub.report(item_id, event.model_dump(exclude={"item_id"}))
+
+# 아이템별 작업 상태 조회
+@api_router.get("/progress/{item_id}")
+def read_progress(item_id: int):
+    state = websocket.progress_hub.states.get(item_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return state
+
+# 제품 일괄 등록 (NDJSON 또는 CSV, 한 줄에 제품 하나)
+@api_router.post("/items/import")
+def import_items(file: UploadFile = File(...), format: Optional[str] = None, user_id: int = Depends(auth.current_user_id), db: Session = Depends(get_db)):
+    return bulk.import_items(db, file.file, bulk.detect_format(format, file.filename))
+
+# 제품 / 주문 / 리뷰 내보내기 (NDJSON 또는 CSV 스트리밍, 로그인 필요, 주문은 본인 주문만)
+@api_router.get("/export/{table}")
+def export_table(table: str, format: str = "ndjson", user_id: int = Depends(auth.current_user_id)):
+    if table not in bulk.EXPORT_MODELS:
+        raise HTTPException(status_code=404, detail=f"Unknown table: {table}")
+    format = bulk.detect_format(format)
+    return StreamingResponse(
+        bulk.export_rows(table, format, user_id),
+        media_type=bulk.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
+
+# Prometheus 수집용 (api_router 밖에 두어 /metrics 로 노출)
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# 캐시 적중률 조회
+@api_router.get("/cache/stats")
+def read_cache_stats():
+    return cache.stats()
+
+# 작업 목록 조회
+@api_router.get("/jobs", response_model=List[schemas.JobSchema])
+def read_jobs(status: str = None, item_id: int = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    return job_queue.get_jobs(db, status=status, item_id=item_id, skip=skip, limit=limit)
+
+# 작업 상태 조회
+@api_router.get("/jobs/{job_id}", response_model=schemas.JobSchema)
+def read_job(job_id: int, db: Session = Depends(get_db)):
+    db_job = job_queue.get_job(db, job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+# 실패한 작업 재시도
+@api_router.post("/jobs/{job_id}/retry", response_model=schemas.JobSchema)
+def retry_job(job_id: int, db: Session = Depends(get_db)):
+    db_job = job_queue.retry_job(db, job_id)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return db_job
+
+# '기타' 카테고리의 제품 삭제 (바로 숨기고 실제 삭제는 작업 큐에서 나눠서 진행)
 @api_router.delete("/category")
 def delete_other_category_items(db: Session = Depends(get_db)):
-    crud.delete_items_in_other_category(db)
+    compaction.soft_delete_other_category_items(db)
 
     return True
 
+# 카테고리의 제품 전체 삭제 (응답의 job_id 로 정리 진행 상황 확인)
+@api_router.delete("/categories/{category_id}/items")
+def delete_category_items(category_id: int, db: Session = Depends(get_db)):
+    if db.query(models.Category.id).filter(models.Category.id == category_id).scalar() is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return compaction.soft_delete_category_items(db, category_id)
+
 app.include_router(api_router)
 
@@ -0,0 +1,65 @@
+import argparse
+
+import compaction
+import crud
+import models
+import search_index
+from database import SessionLocal, engine
+
+
+# 검색 색인 다시 만들기
+def reindex_search():
+    models.Base.metadata.create_all(bind=engine)
+    if not search_index.ensure_index(engine):
+        print("Search index is not available on this database")
+        return
+    db = SessionLocal()
+    try:
+        count = search_index.rebuild(db)
+    finally:
+        db.close()
+    print(f"Indexed {count} items")
+
+
+# 리뷰 통계 다시 계산하기
+def rebuild_ratings():
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = crud.rebuild_item_ratings(db)
+    finally:
+        db.close()
+    print(f"Rebuilt ratings for {count} items")
+
+
+# 이미지 변형이 없는 기존 제품의 변형 생성 작업 등록 (실행 중인 서버의 작업 큐가 처리)
+def backfill_image_variants():
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        count = crud.backfill_image_variants(db)
+    finally:
+        db.close()
+    print(f"Queued image variants for {count} items")
+
+
+# 삭제된(숨겨진) 제품을 바로 정리 (보통은 서버의 작업 큐가 처리)
+def compact_items():
+    models.Base.metadata.create_all(bind=engine)
+    batches = compaction.compact()
+    print(f"Compacted deleted items in {batches} batches")
+
+
+commands = {
+    "reindex-search": reindex_search,
+    "rebuild-ratings": rebuild_ratings,
+    "backfill-image-variants": backfill_image_variants,
+    "compact-items": compact_items,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CCRC Mall maintenance commands")
+    parser.add_argument("command", choices=sorted(commands))
+    args = parser.parse_args()
+    commands[args.command]()
@@ -0,0 +1,155 @@
+import os
+import re
+
+from botocore.exceptions import ClientError
+
+# 한 번에 읽어서 흘려보내는 크기 (응답 하나의 메모리 사용량)
+CHUNK_SIZE = 256 * 1024
+# 객체 키는 uuid 기반이라 내용이 바뀌지 않으므로 CDN/브라우저에 오래 캐시
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+CONTENT_TYPES = {
+    ".mp4": "video/mp4",
+    ".ply": "application/octet-stream",
+    ".splat": "application/octet-stream",
+    ".webp": "image/webp",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+}
+
+# 버킷 바로 아래의 파일 이름만 허용 (로컬 저장소에서 경로를 벗어나지 않도록)
+KEY_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+class MediaNotFound(Exception):
+    pass
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def content_type(key: str) -> str:
+    return CONTENT_TYPES.get(os.path.splitext(key)[1].lower(), "application/octet-stream")
+
+
+# S3 에서 Range 로 읽어서 조각씩 돌려줌 (전체를 메모리에 올리지 않음)
+class S3Backend:
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def stat(self, key: str):
+        try:
+            response = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise MediaNotFound(key)
+            raise
+        return response["ContentLength"], response.get("ETag", "").strip('"')
+
+    def read(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE):
+        body = self.client.get_object(Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end}")["Body"]
+        try:
+            while True:
+                chunk = body.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+
+# 로컬 디렉터리 저장소 (테스트/개발용)
+class LocalBackend:
+    def __init__(self, root: str):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def stat(self, key: str):
+        try:
+            stat = os.stat(self.path(key))
+        except FileNotFoundError:
+            raise MediaNotFound(key)
+        return stat.st_size, f"{stat.st_size:x}-{int(stat.st_mtime):x}"
+
+    def read(self, key: str, start: int, end: int, chunk_size: int = CHUNK_SIZE):
+        with open(self.path(key), "rb") as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+
+# MEDIA_ROOT 가 있으면 로컬 디렉터리, 없으면 S3
+def create_backend(s3_client, bucket: str):
+    root = os.environ.get("MEDIA_ROOT")
+    if root:
+        return LocalBackend(root)
+    return S3Backend(s3_client, bucket)
+
+
+# Range 헤더 해석: 범위 하나만 지원하고, 여러 범위나 잘못된 형식은 무시하고 전체를 보냄 (RFC 9110 허용)
+def parse_range(header: str, size: int):
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text == "":
+            # bytes=-N: 마지막 N 바이트
+            length = int(end_text)
+            if length <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - length), size - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+# 스트리밍 응답에 필요한 (상태 코드, 헤더, 읽을 범위) 계산
+# 범위가 None 이면 본문 없이 응답 (304)
+def prepare(backend, key: str, headers) -> tuple:
+    if not KEY_PATTERN.match(key):
+        raise MediaNotFound(key)
+    size, raw_etag = backend.stat(key)
+    etag = f'"{raw_etag}"'
+    response_headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL,
+        "Content-Type": content_type(key),
+    }
+    if_none_match = headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return 304, response_headers, None
+
+    byte_range = None
+    if_range = headers.get("if-range")
+    if size and (if_range is None or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(headers.get("range"), size)
+        except RangeNotSatisfiable:
+            response_headers["Content-Range"] = f"bytes */{size}"
+            raise RangeNotSatisfiable(response_headers)
+    if byte_range is None:
+        response_headers["Content-Length"] = str(size)
+        return 200, response_headers, (0, size - 1)
+    start, end = byte_range
+    response_headers["Content-Length"] = str(end - start + 1)
+    response_headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return 206, response_headers, byte_range
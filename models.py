@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Boolean
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, ForeignKey, Boolean, DateTime, Text, Index, Float
 from sqlalchemy.orm import relationship
 
 from database import Base
@@ -21,16 +23,47 @@ class Item(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(255), nullable=True)
     image = Column(String(255), nullable=True) # 이미지 파일의 경로 저장
+    image_thumb = Column(String(255), nullable=True) # 목록용 작은 WebP
+    image_medium = Column(String(255), nullable=True) # 상세용 중간 크기 WebP
     splat = Column(String(255), nullable=True)
+    splat_compressed = Column(String(255), nullable=True) # 웹 뷰어용 .splat 변환본
     video = Column(String(255), nullable=True) # 동영상 파일의 경로 저장
     description = Column(String(255), nullable=True)
     price = Column(Integer, nullable=True)
+    stock = Column(Integer, nullable=True) # NULL 이면 재고를 관리하지 않음
+    deleted_at = Column(DateTime, nullable=True) # 설정되면 목록/검색/주문에서 제외하고 정리 작업이 나중에 지움
 
     category_id = Column(Integer, ForeignKey("categories.id"))
     category = relationship("Category", backref="items")
 
     orders = relationship("Order", backref="item")
     reviews = relationship("Review", backref="item")
+    rating_summary = relationship("ItemRating", uselist=False, lazy="joined", back_populates="item")
+
+    # 목록 API 의 커서 페이지네이션 접근 경로별 인덱스
+    __table_args__ = (
+        Index("ix_items_price_id", "price", "id"),
+        Index("ix_items_category_id_id", "category_id", "id"),
+        Index("ix_items_category_id_price_id", "category_id", "price", "id"),
+        Index("ix_items_deleted_at_id", "deleted_at", "id"),
+    )
+
+    @property
+    def review_count(self):
+        return self.rating_summary.review_count if self.rating_summary else 0
+
+    # 평균 별점
+    @property
+    def rating(self):
+        return self.rating_summary.star_avg if self.rating_summary else None
+
+    # 별점 1~5 개수
+    @property
+    def star_histogram(self):
+        summary = self.rating_summary
+        if summary is None:
+            return [0, 0, 0, 0, 0]
+        return [summary.star_1, summary.star_2, summary.star_3, summary.star_4, summary.star_5]
 
 
 class Order(Base):
@@ -42,6 +75,32 @@ class Order(Base):
     price = Column(Integer, nullable=True)
     count = Column(Integer, nullable=True)
     pay = Column(Boolean, default=False, nullable=True)
+    request_id = Column(Integer, ForeignKey("order_requests.id"), nullable=True, index=True)
+
+    __table_args__ = (
+        Index("ix_orders_user_id_id", "user_id", "id"),
+        Index("ix_orders_item_id_id", "item_id", "id"),
+    )
+
+
+# 주문 요청의 멱등 키 (같은 키로 다시 요청하면 처음 만든 주문을 돌려줌)
+class OrderRequest(Base):
+    __tablename__ = "order_requests"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    key = Column(String(255), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"))
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    orders = relationship("Order", backref="request")
+
+
+# 사용한 제품 업로드 티켓 (jti 가 기본 키라서 같은 티켓으로 동시에 완료해도 제품은 하나만 만들어짐)
+class UploadTicket(Base):
+    __tablename__ = "upload_tickets"
+
+    jti = Column(String(64), primary_key=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
 class Category(Base):
@@ -59,3 +118,45 @@ class Review(Base):
     star = Column(Integer, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     item_id = Column(Integer, ForeignKey("items.id"))
+
+    __table_args__ = (
+        Index("ix_reviews_item_id_id", "item_id", "id"),
+    )
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    kind = Column(String(50), nullable=False)
+    key = Column(String(255), unique=True, nullable=False) # 중복 실행 방지 키 (예: send_video:<video_uuid>)
+    item_id = Column(Integer, ForeignKey("items.id"), nullable=True, index=True)
+    payload = Column(Text, nullable=True) # JSON
+    status = Column(String(20), default="queued", nullable=False, index=True) # queued, running, done, failed
+    attempts = Column(Integer, default=0, nullable=False)
+    max_attempts = Column(Integer, default=5, nullable=False)
+    last_error = Column(Text, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+
+# 제품별 리뷰 통계 (리뷰 생성 시 같은 트랜잭션에서 갱신)
+class ItemRating(Base):
+    __tablename__ = "item_ratings"
+
+    item_id = Column(Integer, ForeignKey("items.id"), primary_key=True)
+    review_count = Column(Integer, default=0, nullable=False)
+    star_sum = Column(Integer, default=0, nullable=False)
+    star_avg = Column(Float, nullable=True)
+    star_1 = Column(Integer, default=0, nullable=False)
+    star_2 = Column(Integer, default=0, nullable=False)
+    star_3 = Column(Integer, default=0, nullable=False)
+    star_4 = Column(Integer, default=0, nullable=False)
+    star_5 = Column(Integer, default=0, nullable=False)
+
+    item = relationship("Item", back_populates="rating_summary")
+
+    __table_args__ = (
+        Index("ix_item_ratings_star_avg_item_id", "star_avg", "item_id"),
+    )
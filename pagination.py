@@ -0,0 +1,111 @@
+import base64
+import json
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# 정렬 커서는 {"s": 정렬 키, "v": [값, ...]}, 오프셋 커서는 {"o": 오프셋}
+# 모양이 다른 커서가 쿼리까지 가서 500 이 나지 않도록 여기서 400 으로 거름
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(data, dict):
+            raise ValueError
+        if "s" in data or "v" in data:
+            if not isinstance(data.get("s"), str) or not isinstance(data.get("v"), list):
+                raise ValueError
+            if not all(value is None or isinstance(value, (str, int, float)) for value in data["v"]):
+                raise ValueError
+        return data
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# 정렬 키 문자열("price", "-price")을 (정렬 컬럼 목록, 내림차순 여부)로 변환
+# 마지막 정렬 컬럼은 항상 고유한 id
+def sort_columns(model, sort: str, allowed):
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in allowed:
+        raise HTTPException(status_code=400, detail=f"Unsupported sort key: {sort}")
+    columns = [allowed[name]]
+    if name != "id":
+        columns.append(model.id)
+    return columns, descending
+
+
+def _after(columns, values, descending: bool):
+    # (c1, c2, ...) > (v1, v2, ...) 를 NULL 정렬 순서까지 고려해서 풀어 씀
+    # NULL 은 오름차순에서 맨 앞, 내림차순에서 맨 뒤 (SQLite 기본 순서와 같음)
+    column, value = columns[0], values[0]
+    rest = _after(columns[1:], values[1:], descending) if len(columns) > 1 else None
+    if value is None:
+        # NULL 값은 id 가 아닌 정렬 컬럼에서만 나오므로 rest 가 항상 있음
+        if descending:
+            return and_(column.is_(None), rest)
+        return or_(column.isnot(None), and_(column.is_(None), rest))
+    beyond = column < value if descending else column > value
+    if descending:
+        beyond = or_(beyond, column.is_(None))
+    if rest is None:
+        return beyond
+    return or_(beyond, and_(column == value, rest))
+
+
+# 쿼리에 정렬과 커서(또는 기존 skip) 조건 적용
+def apply(query, model, sort: str, allowed, cursor: str = None, skip: int = 0, limit: int = 100):
+    columns, descending = sort_columns(model, sort, allowed)
+    if descending:
+        query = query.order_by(*[column.desc().nulls_last() for column in columns])
+    else:
+        query = query.order_by(*[column.asc().nulls_first() for column in columns])
+
+    if cursor:
+        data = decode_cursor(cursor)
+        if data.get("s") != sort or len(data.get("v", [])) != len(columns):
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        query = query.filter(_after(columns, data["v"], descending))
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+# 결과 마지막 행으로 다음 페이지 커서 생성 (마지막 페이지면 None)
+def next_cursor(rows, sort: str, limit: int):
+    if not rows or len(rows) < limit:
+        return None
+    name = sort.lstrip("-")
+    last = rows[-1]
+    value = last.get if isinstance(last, dict) else lambda key: getattr(last, key)
+    values = [value(name)] if name == "id" else [value(name), value("id")]
+    return encode_cursor({"s": sort, "v": values})
+
+
+# 정렬 기준이 없는 목록(검색 관련도 순 등)에 쓰는 오프셋 기반 불투명 커서
+def offset_cursor(cursor: str, skip: int = 0) -> int:
+    if not cursor:
+        return skip
+    data = decode_cursor(cursor)
+    if not isinstance(data.get("o"), int) or data["o"] < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return data["o"]
+
+
+def next_offset_cursor(rows, offset: int, limit: int):
+    if not rows or len(rows) < limit:
+        return None
+    return encode_cursor({"o": offset + len(rows)})
+
+
+def set_next_cursor(response: Response, cursor: str):
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
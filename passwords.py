@@ -0,0 +1,100 @@
+import asyncio
+import hmac
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+
+# argon2id 비용 (운영 서버 사양에 맞춰 환경 변수로 조정, 기본값은 RFC 9106 권장치 근처)
+TIME_COST = int(os.environ.get("ARGON2_TIME_COST", "3"))
+MEMORY_COST = int(os.environ.get("ARGON2_MEMORY_COST", str(64 * 1024)))  # KiB
+PARALLELISM = int(os.environ.get("ARGON2_PARALLELISM", "1"))
+
+# 해시 계산은 GIL 을 풀고 실행되므로 스레드 풀로 코어 수만큼 병렬 처리
+WORKERS = int(os.environ.get("PASSWORD_WORKERS", str(os.cpu_count() or 1)))
+# 대기 중인 계산이 이만큼 쌓이면 더 받지 않음 (로그인 폭주 시 지연이 끝없이 늘어나지 않도록)
+MAX_PENDING = int(os.environ.get("PASSWORD_MAX_PENDING", str(WORKERS * 16)))
+
+ARGON2_PREFIX = "$argon2"
+
+
+class PoolBusyError(Exception):
+    pass
+
+
+hasher = PasswordHasher(time_cost=TIME_COST, memory_cost=MEMORY_COST, parallelism=PARALLELISM)
+
+
+def hash_password(plain_password: str) -> str:
+    return hasher.hash(plain_password)
+
+
+_dummy_hash = None
+
+
+# (일치 여부, 새 해시) 를 돌려줌: 평문으로 저장된 예전 계정이나 비용 설정이 바뀐 해시는 로그인할 때 새 해시로 바꿈
+# 없는 계정(stored_password=None)도 같은 시간이 걸리도록 임시 해시로 검증해서 응답 시간으로 가입 여부를 알 수 없게 함
+def verify_password(plain_password: str, stored_password: str = None):
+    global _dummy_hash
+    if not stored_password:
+        if _dummy_hash is None:
+            _dummy_hash = hash_password("dummy-password")
+        try:
+            hasher.verify(_dummy_hash, plain_password)
+        except VerificationError:
+            pass
+        return False, None
+    if not stored_password.startswith(ARGON2_PREFIX):
+        if not hmac.compare_digest(plain_password.encode(), stored_password.encode()):
+            return False, None
+        return True, hash_password(plain_password)
+    try:
+        hasher.verify(stored_password, plain_password)
+    except (VerifyMismatchError, VerificationError, InvalidHashError):
+        return False, None
+    if hasher.check_needs_rehash(stored_password):
+        return True, hash_password(plain_password)
+    return True, None
+
+
+class PasswordPool:
+    def __init__(self, workers: int = WORKERS, max_pending: int = MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    async def run(self, func, *args):
+        with self.lock:
+            if self.pending >= self.max_pending:
+                raise PoolBusyError("Too many pending password checks")
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        finally:
+            with self.lock:
+                self.pending -= 1
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+pool = PasswordPool()
+
+
+# 워커 수 바꾸기 (벤치마크용)
+def set_workers(workers: int, max_pending: int = None):
+    global pool
+    pool.shutdown()
+    pool = PasswordPool(workers, max_pending or workers * 16)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    return await pool.run(hash_password, plain_password)
+
+
+async def verify_password_async(plain_password: str, stored_password: str):
+    return await pool.run(verify_password, plain_password, stored_password)
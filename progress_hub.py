@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+# 구독자 한 명에게 메시지 하나를 보내는 데 허용하는 최대 시간 (넘으면 느린 클라이언트로 보고 구독 해제)
+SEND_TIMEOUT = 5.0
+# 작업 상태 테이블에 보관하는 최대 작업 수 (오래된 것부터 제거)
+MAX_JOB_STATES = 10000
+
+
+def parse_progress(progress_info: str):
+    try:
+        return float(json.loads(progress_info).get("progress"))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+# 구독자별 전송 큐: 최신 메시지 하나만 보관해서 느린 클라이언트가 밀린 메시지를 쌓지 않게 함
+class Subscriber:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=1)
+        self.task = None
+
+    def offer(self, message: str):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+
+class Job:
+    def __init__(self):
+        self.subscribers = {}
+        self.latest = None
+        self.poller = None
+
+
+# 작업 하나당 폴러 하나만 돌리고, 받은 진행 상황을 모든 구독자에게 뿌리는 허브
+class ProgressHub:
+    def __init__(self, fetch, interval: float = 10.0):
+        self.fetch = fetch
+        self.interval = interval
+        self.jobs = {}
+        # GPU 워커가 푸시한 작업 상태 테이블 (item_id -> 상태)
+        self.states = OrderedDict()
+        self.video_uuids = {}
+        self.loop = None
+
+    def subscribe(self, websocket, job_key="gpu", poll: bool = True):
+        self.loop = asyncio.get_running_loop()
+        job = self.jobs.setdefault(job_key, Job())
+        if id(websocket) in job.subscribers:
+            return
+        subscriber = Subscriber(websocket)
+        subscriber.task = asyncio.create_task(self._send_loop(job_key, subscriber))
+        job.subscribers[id(websocket)] = subscriber
+        # 새로 들어온 구독자는 캐시된 최신 진행 상황부터 받음
+        if job.latest is None and job_key in self.states:
+            job.latest = json.dumps(self.states[job_key])
+        if job.latest is not None:
+            subscriber.offer(job.latest)
+        if poll and (job.poller is None or job.poller.done()):
+            job.poller = asyncio.create_task(self._poll(job_key))
+
+    # 아이템별 구독: GPU 워커가 푸시하는 이벤트만 받고 폴링은 하지 않음
+    def subscribe_item(self, websocket, item_id: int):
+        self.subscribe(websocket, item_id, poll=False)
+        state = self.states.get(item_id)
+        if state is not None and state["progress"] >= 100:
+            self.jobs.pop(item_id, None)
+
+    def find_item_id(self, video_uuid: str):
+        return self.video_uuids.get(video_uuid)
+
+    # GPU 워커가 보낸 진행 이벤트를 상태 테이블에 반영하고 구독자에게 전달
+    def report(self, item_id: int, event: dict):
+        state = self.states.pop(item_id, None) or {"item_id": item_id, "video_uuid": None, "progress": 0}
+        state.update({key: value for key, value in event.items() if value is not None})
+        state["updated_at"] = time.time()
+        self.states[item_id] = state
+        while len(self.states) > MAX_JOB_STATES:
+            _, old_state = self.states.popitem(last=False)
+            self.video_uuids.pop(old_state.get("video_uuid"), None)
+        if state.get("video_uuid"):
+            self.video_uuids[state["video_uuid"]] = item_id
+        self._call_soon(self.publish, item_id, json.dumps(state))
+        if state["progress"] >= 100:
+            self._call_soon(self.jobs.pop, item_id, None)
+        return state
+
+    # 스플랫 생성 완료: 작업을 닫고 구독자에게 알림
+    def complete(self, item_id: int, splat: str = None):
+        return self.report(item_id, {"progress": 100, "status": "done", "splat": splat})
+
+    # 다른 스레드(동기 엔드포인트)에서 불려도 이벤트 루프에서 실행되도록 함
+    def _call_soon(self, callback, *args):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if self.loop is not None and self.loop.is_running():
+                self.loop.call_soon_threadsafe(callback, *args)
+                return
+        callback(*args)
+
+    def unsubscribe(self, websocket, job_key: str = None):
+        keys = [job_key] if job_key is not None else list(self.jobs)
+        for key in keys:
+            job = self.jobs.get(key)
+            if job is None:
+                continue
+            subscriber = job.subscribers.pop(id(websocket), None)
+            if subscriber and subscriber.task and subscriber.task is not asyncio.current_task():
+                subscriber.task.cancel()
+
+    def publish(self, job_key: str, message: str):
+        job = self.jobs.get(job_key)
+        if job is None:
+            return
+        job.latest = message
+        for subscriber in job.subscribers.values():
+            subscriber.offer(message)
+
+    async def _poll(self, job_key: str):
+        while True:
+            job = self.jobs.get(job_key)
+            if job is None or not job.subscribers:
+                self.jobs.pop(job_key, None)
+                return
+            try:
+                progress_info = await self.fetch()
+            except Exception as e:
+                print(f"Failed to fetch progress for {job_key}: {e}")
+            else:
+                self.publish(job_key, progress_info)
+                progress = parse_progress(progress_info)
+                if progress is not None and progress >= 100:
+                    self.jobs.pop(job_key, None)
+                    return
+            await asyncio.sleep(self.interval)
+
+    async def _send_loop(self, job_key: str, subscriber: Subscriber):
+        try:
+            while True:
+                message = await subscriber.queue.get()
+                await asyncio.wait_for(subscriber.websocket.send_text(message), SEND_TIMEOUT)
+                progress = parse_progress(message)
+                if progress is not None and progress >= 100:
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Dropping progress subscriber: {e}")
+        finally:
+            job = self.jobs.get(job_key)
+            if job is not None and job.subscribers.get(id(subscriber.websocket)) is subscriber:
+                del job.subscribers[id(subscriber.websocket)]
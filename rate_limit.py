@@ -0,0 +1,152 @@
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+
+# 경로 그룹별 (초당 토큰, 버킷 크기), 환경 변수 RATE_LIMIT_<GROUP>="초당,버킷" 으로 조정 (예: RATE_LIMIT_SEARCH="5,20")
+DEFAULT_LIMITS = {
+    "auth": (1.0, 10),
+    "search": (5.0, 20),
+    "upload": (0.5, 5),
+    "websocket": (1.0, 10),
+    "default": (50.0, 100),
+}
+
+# (그룹, 메서드, 경로 정규식) 순서대로 처음 맞는 그룹을 사용
+ROUTE_GROUPS = [
+    ("auth", {"POST"}, re.compile(r"^/api/(login|join/?|token/refresh)$")),
+    ("search", {"GET"}, re.compile(r"^/api/items/search/")),
+    ("upload", {"POST"}, re.compile(r"^/api/(items/?|items/import|upload/.*)$")),
+    ("websocket", None, re.compile(r"^/ws")),
+]
+
+ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "1") == "1"
+# 처리 중인 요청이 이 수를 넘으면 새 요청은 503 으로 돌려보냄 (웹소켓 연결은 세지 않음)
+MAX_IN_FLIGHT = int(os.environ.get("RATE_LIMIT_MAX_IN_FLIGHT", "256"))
+# 프록시 뒤에서 실행할 때만 켜기 (X-Forwarded-For 의 첫 주소를 클라이언트로 봄)
+TRUST_FORWARDED = os.environ.get("RATE_LIMIT_TRUST_FORWARDED", "0") == "1"
+MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", "100000"))
+
+
+def load_limits() -> dict:
+    limits = {}
+    for group, default in DEFAULT_LIMITS.items():
+        raw = os.environ.get(f"RATE_LIMIT_{group.upper()}")
+        if raw:
+            rate, burst = raw.split(",")
+            limits[group] = (float(rate), int(burst))
+        else:
+            limits[group] = default
+    return limits
+
+
+# 토큰 버킷 저장소: 버킷은 마지막 사용 순서로 두고, 다시 가득 찰 만큼 쉰 버킷은 앞에서부터 지움
+# (가득 찬 버킷은 새 버킷과 같으므로 지워도 결과가 같음)
+class BucketStore:
+    def __init__(self, limits: dict, max_buckets: int = MAX_BUCKETS):
+        self.limits = limits
+        self.max_buckets = max_buckets
+        self.buckets = OrderedDict()
+        # 가장 오래 걸리는 그룹 기준으로 쉰 버킷 만료 시간을 정함
+        self.idle_ttl = max(burst / rate for rate, burst in limits.values())
+
+    # 토큰 하나를 쓰고 (허용 여부, 재시도까지 남은 초) 를 돌려줌
+    def take(self, group: str, client: str, now: float = None):
+        now = time.monotonic() if now is None else now
+        rate, burst = self.limits[group]
+        key = (group, client)
+        bucket = self.buckets.pop(key, None)
+        if bucket is None:
+            tokens = burst
+        else:
+            tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[key] = (tokens, now)
+        self._expire(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def _expire(self, now: float):
+        while self.buckets:
+            key, (_, last) = next(iter(self.buckets.items()))
+            if now - last < self.idle_ttl and len(self.buckets) <= self.max_buckets:
+                break
+            self.buckets.popitem(last=False)
+
+
+def route_group(method: str, path: str) -> str:
+    for group, methods, pattern in ROUTE_GROUPS:
+        if (methods is None or method in methods) and pattern.match(path):
+            return group
+    return "default"
+
+
+def client_key(scope) -> str:
+    if TRUST_FORWARDED:
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                return value.decode("latin-1").split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+# 순수 ASGI 미들웨어 (BaseHTTPMiddleware 와 달리 응답 본문을 다시 감싸지 않아 스트리밍/웹소켓에 영향 없음)
+class RateLimitMiddleware:
+    def __init__(self, app, limits: dict = None, max_in_flight: int = MAX_IN_FLIGHT, enabled: bool = ENABLED):
+        self.app = app
+        self.store = BucketStore(limits or load_limits())
+        self.max_in_flight = max_in_flight
+        self.enabled = enabled
+        self.in_flight = 0
+        self.rejected = 0
+        self.shed = 0
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] not in ("http", "websocket") or scope.get("method") == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        is_http = scope["type"] == "http"
+        if is_http and self.in_flight >= self.max_in_flight:
+            self.shed += 1
+            await self._reject(scope, send, 503, "Server is busy, try again later", 1)
+            return
+
+        group = route_group(scope.get("method", "GET"), scope["path"])
+        allowed, retry_after = self.store.take(group, client_key(scope))
+        if not allowed:
+            self.rejected += 1
+            await self._reject(scope, send, 429, "Too many requests", retry_after)
+            return
+
+        if not is_http:
+            await self.app(scope, receive, send)
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _reject(self, scope, send, status: int, detail: str, retry_after: float):
+        if scope["type"] == "websocket":
+            # 1013: Try Again Later
+            await send({"type": "websocket.close", "code": 1013})
+            return
+        body = json.dumps({"detail": detail}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def stats(self) -> dict:
+        return {"in_flight": self.in_flight, "rejected": self.rejected, "shed": self.shed, "buckets": len(self.store.buckets)}
@@ -0,0 +1,129 @@
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from botocore.exceptions import ClientError
+
+# 멀티파트 업로드 파트 크기 (S3 최소 파트 크기는 5MB)
+PART_SIZE = 8 * 1024 * 1024
+# 요청 하나가 동시에 올리는 파트 수 (요청당 메모리 상한 = PART_SIZE * MAX_CONCURRENCY)
+MAX_CONCURRENCY = 4
+
+
+def _upload_part(client, bucket: str, key: str, upload_id: str, part_number: int, body: bytes):
+    response = client.upload_part(
+        Bucket=bucket, Key=key, UploadId=upload_id, PartNumber=part_number, Body=body
+    )
+    return {"PartNumber": part_number, "ETag": response["ETag"]}
+
+
+# 파일 객체를 파트 단위로 읽으면서 S3에 스트리밍 업로드
+# 파트 크기보다 작은 파일은 put_object 한 번으로 올린다
+def upload_stream(
+    client,
+    bucket: str,
+    key: str,
+    fileobj,
+    content_type: str = None,
+    part_size: int = PART_SIZE,
+    max_concurrency: int = MAX_CONCURRENCY,
+) -> str:
+    extra = {"ContentType": content_type} if content_type else {}
+
+    first_chunk = fileobj.read(part_size)
+    if len(first_chunk) < part_size:
+        client.put_object(Bucket=bucket, Key=key, Body=first_chunk, **extra)
+        return key
+
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **extra)["UploadId"]
+    parts = []
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            pending = set()
+            part_number = 1
+            chunk = first_chunk
+            while chunk:
+                pending.add(executor.submit(_upload_part, client, bucket, key, upload_id, part_number, chunk))
+                part_number += 1
+                # 동시에 메모리에 올라가는 파트 수를 max_concurrency 로 제한
+                if len(pending) >= max_concurrency:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    parts.extend(future.result() for future in done)
+                chunk = fileobj.read(part_size)
+            done, _ = wait(pending)
+            parts.extend(future.result() for future in done)
+
+        parts.sort(key=lambda part: part["PartNumber"])
+        client.complete_multipart_upload(
+            Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+        )
+    except Exception:
+        client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+    return key
+
+
+# presigned URL 유효 시간(초)
+PRESIGN_EXPIRES = 3600
+# S3 멀티파트 업로드의 최대 파트 수
+MAX_PARTS = 10000
+# 직접 업로드할 수 있는 최대 파일 크기 (기본 파트 크기로 MAX_PARTS 개)
+MAX_UPLOAD_SIZE = PART_SIZE * MAX_PARTS
+
+
+# 클라이언트가 S3 에 직접 올릴 수 있는 URL 발급
+# 파트 크기보다 작은 파일은 PUT URL 하나, 큰 파일은 멀티파트 업로드를 시작하고 파트별 URL 을 발급
+def presign_upload(
+    client,
+    bucket: str,
+    key: str,
+    size: int,
+    content_type: str = None,
+    part_size: int = PART_SIZE,
+    expires: int = PRESIGN_EXPIRES,
+) -> dict:
+    if size <= 0:
+        raise ValueError("File size must be positive")
+    extra = {"ContentType": content_type} if content_type else {}
+    if size < part_size:
+        url = client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": bucket, "Key": key, "ContentLength": size, **extra},
+            ExpiresIn=expires,
+        )
+        headers = {"Content-Type": content_type} if content_type else {}
+        return {"key": key, "method": "PUT", "url": url, "headers": headers}
+
+    part_count = -(-size // part_size)
+    if part_count > MAX_PARTS:
+        raise ValueError(f"File is too large for {MAX_PARTS} parts of {part_size} bytes")
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **extra)["UploadId"]
+    parts = [
+        {
+            "part_number": part_number,
+            "url": client.generate_presigned_url(
+                "upload_part",
+                Params={"Bucket": bucket, "Key": key, "UploadId": upload_id, "PartNumber": part_number},
+                ExpiresIn=expires,
+            ),
+        }
+        for part_number in range(1, part_count + 1)
+    ]
+    return {"key": key, "method": "MULTIPART", "upload_id": upload_id, "part_size": part_size, "parts": parts}
+
+
+# 클라이언트가 올린 파트들로 멀티파트 업로드 완료
+def complete_upload(client, bucket: str, key: str, upload_id: str, parts) -> str:
+    parts = sorted(parts, key=lambda part: part["PartNumber"])
+    client.complete_multipart_upload(
+        Bucket=bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+    )
+    return key
+
+
+# 올라간 객체의 크기 (없으면 None)
+def object_size(client, bucket: str, key: str):
+    try:
+        return client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
@@ -1,6 +1,9 @@
-from typing import Optional
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
 from fastapi import File, UploadFile
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from s3_upload import MAX_UPLOAD_SIZE
 
 
 class UserSchema(BaseModel):
@@ -8,16 +11,66 @@ class UserSchema(BaseModel):
     email: str
     password: str
 
+# 사용자 응답 (비밀번호 해시는 내보내지 않음)
+class UserResponseSchema(BaseModel):
+    id: Optional[int] = None
+    email: str
+
+class TokenSchema(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+    expires_in: int
+
+class RefreshSchema(BaseModel):
+    refresh_token: str
+
 class ItemSchema(BaseModel):
     id: Optional[int] = None
     name: str
     description: str
     price: float
     category_id: int
+    stock: Optional[int] = None
     image: Optional[UploadFile] = File(None)
     splat: Optional[UploadFile] = File(None)
     video: Optional[UploadFile] = File(None)
 
+# 일괄 등록 파일의 한 줄 (이미지/동영상은 이미 올라간 파일의 URL)
+class ItemImportSchema(BaseModel):
+    name: str
+    description: str
+    price: int
+    category_id: int
+    stock: Optional[int] = None
+    image: Optional[str] = None
+    splat: Optional[str] = None
+    video: Optional[str] = None
+
+# 직접 업로드할 파일 (image 또는 video)
+class UploadFileSchema(BaseModel):
+    field: Literal["image", "video"]
+    filename: str
+    content_type: Optional[str] = None
+    size: int = Field(..., gt=0, le=MAX_UPLOAD_SIZE) # 멀티파트 최대 파트 수(10,000)를 넘지 않는 크기만
+
+class ItemUploadRequestSchema(BaseModel):
+    files: List[UploadFileSchema]
+
+class UploadPartSchema(BaseModel):
+    part_number: int
+    etag: str
+
+# 업로드가 끝난 뒤 제품 등록 (parts 는 멀티파트로 올린 파일의 파트 번호와 ETag)
+class ItemFinalizeSchema(BaseModel):
+    ticket: str
+    name: str
+    description: str
+    price: float
+    category_id: int
+    stock: Optional[int] = None
+    parts: Dict[str, List[UploadPartSchema]] = {}
+
 class ItemResponseModel(BaseModel):
     id: Optional[int] = None
     name: str
@@ -25,16 +78,30 @@ class ItemResponseModel(BaseModel):
     price: float
     category_id: int
     image: Optional[str]
+    image_thumb: Optional[str] = None
+    image_medium: Optional[str] = None
     splat: Optional[str]
+    splat_compressed: Optional[str] = None
     video: Optional[str]
+    stock: Optional[int] = None
+    review_count: int = 0
+    rating: Optional[float] = None
+    star_histogram: List[int] = [0, 0, 0, 0, 0]
     
 class OrderSchema(BaseModel):
     id: Optional[int] = None
-    user_id: int
+    user_id: Optional[int] = None # 요청에서는 토큰의 사용자로 채움
+    item_id: int
+    price: Optional[int] = None # 요청의 가격은 무시하고 서버에서 계산
+    count: int
+    pay: bool = False
+
+class OrderLineSchema(BaseModel):
     item_id: int
-    price: int
     count: int
-    pay: bool
+
+class CartSchema(BaseModel):
+    lines: List[OrderLineSchema]
 
 class CategorySchema(BaseModel):
     id: Optional[int] = None
@@ -43,6 +110,41 @@ class CategorySchema(BaseModel):
 class ReviewSchema(BaseModel):
     id: Optional[int] = None
     content: str
-    star: int
-    user_id: int
-    item_id: int
\ No newline at end of file
+    star: int = Field(..., ge=1, le=5) # 별점 통계(합계/평균/1~5 분포)가 리뷰 수와 맞도록 1~5 만 허용
+    user_id: Optional[int] = None # 요청에서는 토큰의 사용자로 채움
+    item_id: int
+
+class ProgressEventSchema(BaseModel):
+    item_id: Optional[int] = None
+    video_uuid: Optional[str] = None
+    progress: float
+    status: Optional[str] = None
+    elapsed_time: Optional[float] = None
+    remain_time: Optional[float] = None
+
+class JobSchema(BaseModel):
+    id: int
+    kind: str
+    key: str
+    item_id: Optional[int] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    run_after: datetime
+    created_at: datetime
+    updated_at: datetime
+
+class ItemMediaSchema(BaseModel):
+    image: Optional[str] = None
+    video: Optional[str] = None
+    splat: Optional[str] = None
+
+class ItemDetailResponse(BaseModel):
+    item: ItemResponseModel
+    category: Optional[CategorySchema] = None
+    media: ItemMediaSchema
+    reviews: List[ReviewSchema]
+    review_count: int
+    star_avg: Optional[float] = None
+    next_review_cursor: Optional[str] = None
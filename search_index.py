@@ -0,0 +1,168 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+# FTS5 를 쓸 수 없는 환경(다른 DB, FTS5 미포함 SQLite)에서는 ilike 검색으로 대체
+enabled = False
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+HANGUL_RE = re.compile(r"[가-힣]+")
+# 이름 일치를 설명 일치보다 높게 평가
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+REBUILD_BATCH_SIZE = 1000
+# 검색어 끝에서 떼어 내는 조사 (긴 것부터 비교)
+PARTICLES = (
+    "에서", "으로", "에게", "까지", "부터", "처럼", "보다", "이랑", "하고",
+    "을", "를", "이", "가", "은", "는", "에", "의", "도", "로", "와", "과", "만", "랑",
+)
+
+
+def _bigrams(word: str):
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+# 한국어는 조사가 붙어 띄어쓰기 단위로 검색되지 않으므로 한글 구간을 2글자 단위(bigram)로 쪼개서 색인
+# 예: "가죽가방을" -> "가죽가방을 가죽 죽가 가방 방을"
+def tokenize(value: str) -> str:
+    terms = []
+    for token in TOKEN_RE.findall((value or "").lower()):
+        terms.append(token)
+        for run in HANGUL_RE.findall(token):
+            terms.extend(gram for gram in _bigrams(run) if gram != token)
+    return " ".join(terms)
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+# 검색어에 붙은 조사는 색인된 제품명에 없으므로 ("가죽가방을" 의 "방을") 떼어 냄
+# 조사가 아닌 글자를 떼어도 ("고양이" -> "고양") 검색 범위가 넓어질 뿐 원래 결과는 그대로 나옴
+def _strip_particle(token: str) -> str:
+    for particle in PARTICLES:
+        if token.endswith(particle) and len(token) - len(particle) >= 2:
+            return token[:-len(particle)]
+    return token
+
+
+# 검색어를 FTS5 MATCH 식으로 변환 (마지막 단어는 자동완성을 위해 접두어 검색)
+def build_match(query: str):
+    tokens = TOKEN_RE.findall((query or "").lower())
+    clauses = []
+    for index, token in enumerate(tokens):
+        last = index == len(tokens) - 1
+        if HANGUL_RE.fullmatch(token):
+            token = _strip_particle(token)
+        if HANGUL_RE.fullmatch(token) and len(token) > 2:
+            grams = _bigrams(token)
+            terms = [_quote(gram) for gram in grams[:-1]]
+            terms.append(_quote(grams[-1]) + ("*" if last else ""))
+            clauses.append("(" + " AND ".join(terms) + ")")
+        else:
+            clauses.append(_quote(token) + ("*" if last else ""))
+    return " AND ".join(clauses) or None
+
+
+def ensure_index(engine) -> bool:
+    global enabled
+    if engine.dialect.name != "sqlite":
+        enabled = False
+        return enabled
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'items_fts'")
+            ).first()
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts "
+                "USING fts5(name, description, tokenize = 'unicode61 remove_diacritics 2')"
+            ))
+        enabled = True
+    except OperationalError as e:
+        print(f"FTS5 search index is not available, falling back to LIKE search: {e}")
+        enabled = False
+        return enabled
+
+    # 처음 만들어졌으면 기존 제품을 색인
+    if not exists:
+        db = SessionLocal()
+        try:
+            rebuild(db)
+        finally:
+            db.close()
+    return enabled
+
+
+# 제품 색인 추가/갱신 (호출한 쪽의 트랜잭션 안에서 실행됨)
+def index_item(db: Session, item: models.Item):
+    if not enabled:
+        return
+    db.execute(text("DELETE FROM items_fts WHERE rowid = :id"), {"id": item.id})
+    db.execute(
+        text("INSERT INTO items_fts (rowid, name, description) VALUES (:id, :name, :description)"),
+        {"id": item.id, "name": tokenize(item.name), "description": tokenize(item.description)},
+    )
+
+
+# 여러 제품을 한 번에 색인 (id, name, description 속성이 있는 행, 새로 추가된 제품용)
+def index_rows(db: Session, rows):
+    if not enabled or not rows:
+        return
+    db.execute(
+        text("INSERT INTO items_fts (rowid, name, description) VALUES (:id, :name, :description)"),
+        [{"id": row.id, "name": tokenize(row.name), "description": tokenize(row.description)} for row in rows],
+    )
+
+
+def remove_items(db: Session, item_ids):
+    if not enabled or not item_ids:
+        return
+    db.execute(
+        text("DELETE FROM items_fts WHERE rowid = :id"), [{"id": item_id} for item_id in item_ids]
+    )
+
+
+def rebuild(db: Session) -> int:
+    if not enabled:
+        return 0
+    db.execute(text("DELETE FROM items_fts"))
+    count = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.query(models.Item.id, models.Item.name, models.Item.description)
+            .filter(models.Item.id > last_id)
+            .order_by(models.Item.id)
+            .limit(REBUILD_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            break
+        index_rows(db, rows)
+        count += len(rows)
+        last_id = rows[-1].id
+    db.commit()
+    return count
+
+
+# 관련도 순 검색 결과 (제품 ID 목록)
+def search(db: Session, query: str, skip: int = 0, limit: int = 100):
+    match = build_match(query)
+    if match is None:
+        return []
+    rows = db.execute(
+        text(
+            "SELECT rowid FROM items_fts WHERE items_fts MATCH :match "
+            "ORDER BY bm25(items_fts, :name_weight, :description_weight), rowid "
+            "LIMIT :limit OFFSET :skip"
+        ),
+        {"match": match, "name_weight": NAME_WEIGHT, "description_weight": DESCRIPTION_WEIGHT,
+         "limit": limit, "skip": skip},
+    )
+    return [row[0] for row in rows]
@@ -0,0 +1,85 @@
+# 3D Gaussian Splatting 학습 결과(.ply)를 웹 뷰어용 .splat 으로 변환
+# .splat 은 가우시안 하나를 32바이트로 저장: 위치 float32×3, 크기 float32×3, 색상+불투명도 uint8×4, 회전 uint8×4
+# (PLY 의 가우시안 하나는 구면 조화 계수까지 약 248바이트라서 8배 가까이 작아짐)
+# 큰 가우시안부터 저장하므로 뷰어가 앞부분만 받아도 전체 모양을 먼저 그릴 수 있음
+
+SH_C0 = 0.28209479177387814
+SPLAT_ROW_SIZE = 32
+
+PLY_TYPES = {
+    "float": "<f4", "float32": "<f4",
+    "double": "<f8", "float64": "<f8",
+    "uchar": "u1", "uint8": "u1",
+    "char": "i1", "int8": "i1",
+    "short": "<i2", "int16": "<i2",
+    "ushort": "<u2", "uint16": "<u2",
+    "int": "<i4", "int32": "<i4",
+    "uint": "<u4", "uint32": "<u4",
+}
+REQUIRED_FIELDS = (
+    "x", "y", "z", "f_dc_0", "f_dc_1", "f_dc_2", "opacity",
+    "scale_0", "scale_1", "scale_2", "rot_0", "rot_1", "rot_2", "rot_3",
+)
+
+
+# PLY 헤더에서 (가우시안 수, 필드 목록, 헤더 길이) 읽기 (binary_little_endian 만 지원)
+def read_header(f):
+    line = f.readline()
+    if line.strip() != b"ply":
+        raise ValueError("Not a PLY file")
+    count = None
+    fields = []
+    in_vertex = False
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("Unexpected end of PLY header")
+        parts = line.decode("ascii", "replace").split()
+        if not parts:
+            continue
+        if parts[0] == "format" and parts[1] != "binary_little_endian":
+            raise ValueError(f"Unsupported PLY format: {parts[1]}")
+        elif parts[0] == "element":
+            in_vertex = parts[1] == "vertex"
+            if in_vertex:
+                count = int(parts[2])
+        elif parts[0] == "property" and in_vertex:
+            if parts[1] == "list":
+                raise ValueError("List properties are not supported on vertices")
+            fields.append((parts[2], PLY_TYPES[parts[1]]))
+        elif parts[0] == "end_header":
+            break
+    missing = [name for name in REQUIRED_FIELDS if name not in dict(fields)]
+    if count is None or missing:
+        raise ValueError(f"Not a Gaussian splat PLY (missing: {', '.join(missing) or 'vertex'})")
+    return count, fields, f.tell()
+
+
+# PLY 파일 경로를 받아 .splat 바이트 파일로 저장, 변환한 가우시안 수를 돌려줌
+def convert_file(ply_path: str, splat_path: str) -> int:
+    import numpy as np
+
+    with open(ply_path, "rb") as f:
+        count, fields, offset = read_header(f)
+    # 큰 파일도 메모리에 한 번에 올리지 않도록 memmap 으로 읽음
+    vertices = np.memmap(ply_path, dtype=np.dtype(fields), mode="r", offset=offset, shape=(count,))
+
+    scales = np.exp(np.stack([vertices[f"scale_{i}"] for i in range(3)], axis=1).astype(np.float32))
+    opacity = 1 / (1 + np.exp(-vertices["opacity"].astype(np.float32)))
+    order = np.argsort(-(scales.prod(axis=1) * opacity))
+
+    output = np.zeros(count, dtype=np.dtype([
+        ("position", "<f4", 3), ("scale", "<f4", 3), ("color", "u1", 4), ("rotation", "u1", 4),
+    ]))
+    output["position"] = np.stack([vertices[name] for name in ("x", "y", "z")], axis=1)[order]
+    output["scale"] = scales[order]
+    color = np.stack([0.5 + SH_C0 * vertices[f"f_dc_{i}"] for i in range(3)] + [opacity], axis=1)
+    output["color"] = np.clip(color[order] * 255, 0, 255).astype(np.uint8)
+    rotation = np.stack([vertices[f"rot_{i}"] for i in range(4)], axis=1).astype(np.float32)
+    norm = np.linalg.norm(rotation, axis=1, keepdims=True)
+    rotation = rotation / np.where(norm == 0, 1, norm)
+    output["rotation"] = np.clip(rotation[order] * 128 + 128, 0, 255).astype(np.uint8)
+
+    output.tofile(splat_path)
+    del vertices
+    return count
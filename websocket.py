@@ -1,8 +1,7 @@
-import json
 from fastapi import FastAPI, WebSocket
-import asyncio
-import httpx
-import requests
+
+from gpu_client import gpu_client
+from progress_hub import ProgressHub
 
 app = FastAPI()
 
@@ -22,43 +21,24 @@ async def websocket_endpoint(websocket: WebSocket):
             # 클라이언트로부터 메시지 수신
             data = await websocket.receive_text()
 
-            # 클라이언트로부터 'send' 메시지를 수신했을 때마다 백그라운드 작업 시작
+            # 클라이언트로부터 'send' 메시지를 받으면 진행 상황 허브에 구독 등록
             if data == "send":
-                await send_progress_until_done(websocket)
+                progress_hub.subscribe(websocket)
+            # 'subscribe:<item_id>' 메시지로 특정 아이템의 진행 상황만 구독
+            elif data.startswith("subscribe:"):
+                progress_hub.subscribe_item(websocket, int(data.split(":", 1)[1]))
+            elif data.startswith("unsubscribe:"):
+                progress_hub.unsubscribe(websocket, int(data.split(":", 1)[1]))
     except Exception as e:
         print(e)
     finally:
-        # 연결이 종료되면 해당 WebSocket 객체를 딕셔너리에서 제거
+        # 연결이 종료되면 해당 WebSocket 객체를 딕셔너리와 허브에서 제거
+        progress_hub.unsubscribe(websocket)
         del client_connections[id(websocket)]
 
-# 백그라운드 작업: 클라이언트에게 진행 상황을 보냄
-async def send_progress_until_done(websocket: WebSocket):
-    while True:
-        progress_info = await get_progress_from_gpu_server()
-        await websocket.send_text(progress_info)
-#    if progress_info["progress"] == 100:
-#        await websocket.close()
-
-
-#async def get_progress_from_gpu_server():
- #   progress = 0
-  #  elapsed_time = 0
-   # while progress <= 100:
-    #    # 경과 시간 증가, 남은 시간 감소
-     #   elapsed_time += 2
-      #  remain_time = 100 - progress
-       # progress_info = {
-        #    "progress": progress,
-         #   "elapsed_time": elapsed_time,
-          #  "remain_time": remain_time
-#        }
-#        progress += 10
-#        yield json.dumps(progress_info)  # JSON 형식으로 직렬화하여 반환
-#        await asyncio.sleep(2)
-
+# 호출 지연 시간은 gpu_client 가 gpu_request_duration_seconds 지표로 기록
 async def get_progress_from_gpu_server():
-    response = requests.get("http://163.180.117.43:9003/api/proginfo")
-    progress_info = response.text  # JSON 형식의 응답을 파싱하여 진행 정보 추출
-    print(progress_info)
-    await asyncio.sleep(10)
-    return progress_info
+    return await gpu_client.get_progress()
+
+# GPU 서버는 작업 하나당 폴러 하나만 폴링하고, 결과를 구독 중인 모든 클라이언트에 전달
+progress_hub = ProgressHub(get_progress_from_gpu_server, interval=10)
@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy.orm import sessionmaker
+
+from database import WRITE_BATCHING, engine
+
+# 한 번에 묶어서 커밋하는 최대 쓰기 수와, 묶음을 모으려고 기다리는 최대 시간(초)
+MAX_BATCH = 64
+MAX_WAIT = 0.002
+
+# 배치 커밋 후에도 결과 객체를 읽을 수 있도록 expire_on_commit=False
+BatchSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+
+# op 가 세션에 변경을 남기지 않고 요청만 거절할 때 던짐 (묶음의 다른 쓰기는 그대로 커밋되고, 요청한 쪽은 error 를 받음)
+class Rejected(Exception):
+    def __init__(self, error: Exception):
+        super().__init__(error)
+        self.error = error
+
+
+class WriteOp:
+    def __init__(self, func, args, after_commit=None):
+        self.func = func
+        self.args = args
+        self.after_commit = after_commit
+        self.future = Future()
+
+
+# SQLite 단일 쓰기 스레드: 작은 쓰기 요청들을 모아서 한 트랜잭션(그룹 커밋)으로 처리
+class WriteBatcher:
+    def __init__(self, session_factory=BatchSessionLocal, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._loop, name="write-batcher", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+
+    # func(db, *args) 는 커밋하지 않고 변경만 하고, after_commit(result) 는 커밋 후 실행됨
+    def submit(self, func, *args, after_commit=None) -> Future:
+        self.start()
+        op = WriteOp(func, args, after_commit)
+        self.queue.put(op)
+        return op.future
+
+    def run(self, func, *args, after_commit=None):
+        return self.submit(func, *args, after_commit=after_commit).result()
+
+    def _loop(self):
+        while True:
+            op = self.queue.get()
+            if op is None:
+                return
+            batch = [op]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                try:
+                    op = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    self._commit(batch)
+                    return
+                batch.append(op)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        db = self.session_factory()
+        try:
+            results = [self._apply(db, op) for op in batch]
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.close()
+            # 하나라도 실패하면 묶음을 버리고 하나씩 따로 커밋해서 실패한 요청만 에러를 받게 함
+            for op in batch:
+                self._commit_one(op)
+            return
+        db.close()
+        self.batches += 1
+        self.writes += len(batch)
+        for op, result in zip(batch, results):
+            if isinstance(result, Rejected):
+                op.future.set_exception(result.error)
+            else:
+                self._resolve(op, result)
+
+    def _apply(self, db, op):
+        try:
+            return op.func(db, *op.args)
+        except Rejected as e:
+            return e
+
+    def _commit_one(self, op):
+        db = self.session_factory()
+        try:
+            result = op.func(db, *op.args)
+            db.commit()
+        except Rejected as e:
+            db.rollback()
+            op.future.set_exception(e.error)
+            return
+        except Exception as e:
+            db.rollback()
+            op.future.set_exception(e)
+            return
+        finally:
+            db.close()
+        self.batches += 1
+        self.writes += 1
+        self._resolve(op, result)
+
+    def _resolve(self, op, result):
+        try:
+            if op.after_commit is not None:
+                op.after_commit(result)
+        except Exception as e:
+            print(f"after_commit hook failed: {e}")
+        op.future.set_result(result)
+
+
+batcher = WriteBatcher()
+enabled = WRITE_BATCHING